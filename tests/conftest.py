@@ -7,20 +7,70 @@ These tests validate the Lua dissector by:
 3. Testing protobuf parsing with binary fixtures
 """
 
+import os
+import struct
 import sys
-import pytest
+from functools import lru_cache
 from pathlib import Path
 
-# Add tests directory to path for lua_bridge import
+import pytest
+
+# Add tests directory to path for lua_bridge and varint_cases imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from lua_bridge import get_bridge, get_omni_bridge, reset_bridge, LuaBridge, OmniBridge
+from lua_bridge import (get_bridge, get_omni_bridge, restore_lua_globals, snapshot_lua_globals,
+                        LuaBridge)
+from varint_cases import VARINT_TEST_CASES
 
 # Project paths
-PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
 FIXTURES_DIR = PROJECT_ROOT / "tests" / "fixtures"
 TAKCOT_EXAMPLES = FIXTURES_DIR / "cot_examples"
 OMNI_TEST_ASSETS = FIXTURES_DIR / "omni_assets"
+TAK_LUA = PROJECT_ROOT / "tak.lua"
+OMNI_LUA = PROJECT_ROOT / "omni.lua"
+
+class PluginSource:
+    """
+    A plugin's cached source bytes, searched with `in`.
+
+    str needles are encoded as UTF-8, so tests can check plain literals
+    directly; the short repr keeps assertion failures readable.
+    """
+
+    __slots__ = ("name", "data")
+
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.data = data
+
+    def __contains__(self, needle: str | bytes) -> bool:
+        if isinstance(needle, str):
+            needle = needle.encode("utf-8")
+        return needle in self.data
+
+    def __repr__(self) -> str:
+        return f"<{self.name} source, {len(self.data)} bytes>"
+
+
+def _try_read(path: Path, *, text: bool = False) -> str | bytes | None:
+    """Read a fixture file, or return None if it does not exist."""
+    try:
+        return path.read_text(encoding="utf-8") if text else path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _load_text(path: Path) -> str | None:
+    """Read a UTF-8 fixture file once per run, or None if it is missing."""
+    return _try_read(path, text=True)
+
+
+@lru_cache(maxsize=None)
+def _load_bytes(path: Path) -> bytes | None:
+    """Read a binary fixture file once per run, or None if it is missing."""
+    return _try_read(path)
 
 
 def pytest_configure(config):
@@ -28,86 +78,119 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "req(req_id): Link test to requirement ID")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def project_root():
     """Return the project root directory."""
     return PROJECT_ROOT
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def fixtures_dir():
     """Return the test fixtures directory."""
     return FIXTURES_DIR
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def takcot_examples():
     """Return path to TAK CoT XML examples."""
     return TAKCOT_EXAMPLES
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def omni_test_assets():
     """Return path to OMNI binary test assets."""
     return OMNI_TEST_ASSETS
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def tak_lua_path():
+    """Return path to the tak.lua plugin."""
+    return TAK_LUA
+
+
+@pytest.fixture(scope="session")
+def tak_lua_source(tak_lua_path):
+    """
+    Load the raw tak.lua plugin source once per session.
+
+    The literals the source checks look for are ASCII, so
+    `'literal' in tak_lua_source` searches the undecoded UTF-8 bytes.
+    Tests that need it are skipped if the plugin is missing.
+    """
+    data = _load_bytes(tak_lua_path)
+    if data is None:
+        pytest.skip(f"{tak_lua_path.name} not available")
+    return PluginSource("tak.lua", data)
+
+
+@pytest.fixture(scope="session")
+def tak_lua_lower(tak_lua_source):
+    """Lowercased raw tak.lua source, for case-insensitive checks."""
+    return PluginSource("tak.lua (lowercased)", tak_lua_source.data.lower())
+
+
+@pytest.fixture(scope="session")
+def lua_sources(tak_lua_source):
+    """
+    Load the tak.lua and omni.lua plugin sources once per session.
+
+    Tests that need them are skipped if either plugin is missing; the
+    skip is cached with the fixture, so it is decided once.
+    """
+    omni = _load_bytes(OMNI_LUA)
+    if omni is None:
+        pytest.skip(f"{OMNI_LUA.name} not available")
+    return {"tak": tak_lua_source, "omni": PluginSource("omni.lua", omni)}
+
+
+@pytest.fixture(scope="session")
 def marker_spot_xml():
     """Load Marker - Spot.cot XML example."""
-    path = TAKCOT_EXAMPLES / "Marker - Spot.cot"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return None
+    return _load_text(TAKCOT_EXAMPLES / "Marker - Spot.cot")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def marker_2525_xml():
     """Load Marker - 2525.cot XML example."""
-    path = TAKCOT_EXAMPLES / "Marker - 2525.cot"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return None
+    return _load_text(TAKCOT_EXAMPLES / "Marker - 2525.cot")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def route_xml():
     """Load Route.cot XML example."""
-    path = TAKCOT_EXAMPLES / "Route.cot"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return None
+    return _load_text(TAKCOT_EXAMPLES / "Route.cot")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def circle_xml():
     """Load Drawing Shapes - Circle.cot XML example."""
-    path = TAKCOT_EXAMPLES / "Drawing Shapes - Circle.cot"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return None
+    return _load_text(TAKCOT_EXAMPLES / "Drawing Shapes - Circle.cot")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def geofence_xml():
     """Load Geo Fence.cot XML example."""
-    path = TAKCOT_EXAMPLES / "Geo Fence.cot"
-    if path.exists():
-        return path.read_text(encoding="utf-8")
-    return None
+    return _load_text(TAKCOT_EXAMPLES / "Geo Fence.cot")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def cot_example_texts():
+    """Load every .cot example once per session as (filename, text) pairs."""
+    if not TAKCOT_EXAMPLES.is_dir():
+        return ()
+    with os.scandir(TAKCOT_EXAMPLES) as it:
+        names = sorted(e.name for e in it if e.name.endswith(".cot") and e.is_file())
+    return tuple((name, _load_text(TAKCOT_EXAMPLES / name)) for name in names)
+
+
+@pytest.fixture(scope="session")
 def omni_player_event_bin():
     """Load OMNI PlayerEvent binary test fixture."""
-    path = OMNI_TEST_ASSETS / "test_playerevent.bin"
-    if path.exists():
-        return path.read_bytes()
-    return None
+    return _load_bytes(OMNI_TEST_ASSETS / "test_playerevent.bin")
 
 
 # Sample protobuf test data
-@pytest.fixture
+@pytest.fixture(scope="session")
 def tak_stream_sample():
     """
     Sample TAK Stream protocol message (version 1).
@@ -129,7 +212,7 @@ def tak_stream_sample():
     ])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def tak_mesh_sample():
     """
     Sample TAK Mesh protocol message (version 2+).
@@ -149,20 +232,22 @@ def tak_mesh_sample():
     ])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def lat_blob():
+    """Marker - Spot.cot latitude packed as a little-endian double."""
+    return struct.pack("<d", 38.85606343062312)
+
+
+@pytest.fixture(scope="session")
+def lon_blob():
+    """Marker - Spot.cot longitude packed as a little-endian double."""
+    return struct.pack("<d", -77.0563755018233)
+
+
+@pytest.fixture(scope="session")
 def varint_test_cases():
     """Test cases for varint decoding."""
-    return [
-        # (bytes, expected_value, expected_bytes_consumed)
-        (bytes([0x00]), 0, 1),
-        (bytes([0x01]), 1, 1),
-        (bytes([0x7F]), 127, 1),
-        (bytes([0x80, 0x01]), 128, 2),
-        (bytes([0xFF, 0x01]), 255, 2),
-        (bytes([0xAC, 0x02]), 300, 2),
-        (bytes([0x96, 0x01]), 150, 2),
-        (bytes([0x80, 0x80, 0x01]), 16384, 3),
-    ]
+    return VARINT_TEST_CASES
 
 
 # =========================================================================
@@ -180,30 +265,64 @@ def lua_bridge() -> LuaBridge:
     return get_bridge()
 
 
-@pytest.fixture
-def pb(lua_bridge: LuaBridge) -> LuaBridge:
-    """Shorthand fixture for protobuf testing via Lua bridge."""
-    return lua_bridge
+# pb and xml_parser return the shared bridge themselves rather than
+# depending on lua_bridge, so pytest resolves no extra fixture hop
+@pytest.fixture(scope="session")
+def pb() -> LuaBridge:
+    """Shorthand fixture for protobuf testing via the Lua bridge."""
+    return get_bridge()
 
 
-@pytest.fixture
-def xml_parser(lua_bridge: LuaBridge) -> LuaBridge:
-    """Shorthand fixture for XML parser testing via Lua bridge."""
-    return lua_bridge
+@pytest.fixture(scope="session")
+def xml_parser() -> LuaBridge:
+    """Shorthand fixture for XML parser testing via the Lua bridge."""
+    return get_bridge()
+
+
+@pytest.fixture(scope="session")
+def varint_batch_results(pb: LuaBridge) -> dict[bytes, tuple[int | None, int]]:
+    """Lua decode_varint results for every VARINT_TEST_CASES input, from one batched call."""
+    inputs = [data for data, _, _ in VARINT_TEST_CASES]
+    return dict(zip(inputs, pb.decode_varint_batch((data, 0) for data in inputs)))
 
 
 @pytest.fixture(scope="session")
-def omni_bridge() -> OmniBridge:
+def marker_spot_parsed(marker_spot_xml, xml_parser: LuaBridge) -> dict[str, str | None] | None:
     """
-    Provide an OMNI Lua bridge instance for testing actual Lua code.
+    Elements of Marker - Spot.cot extracted once by the Lua XML parser.
 
-    This fixture loads omni.lua via lupa and provides access to the
-    pb (protobuf) module for direct testing.
+    Maps each element name to its xml_get_element_with_attrs() result
+    (None for elements the example does not contain).
     """
-    return get_omni_bridge()
+    if marker_spot_xml is None:
+        return None
+    return {
+        name: xml_parser.xml_get_element_with_attrs(marker_spot_xml, name)
+        for name in ("event", "point", "contact", "status", "precisionlocation",
+                     "__group", "takv", "track")
+    }
+
+
+@pytest.fixture(scope="session")
+def _lua_globals_snapshot(lua_bridge: LuaBridge) -> dict:
+    """
+    Snapshot the shared Lua runtime's globals once, after both plugins load.
+
+    omni.lua is loaded first so its globals are part of the snapshot
+    rather than being removed as test-added state.
+    """
+    get_omni_bridge()
+    return snapshot_lua_globals(lua_bridge.lua)
 
 
 @pytest.fixture
-def omni_pb(omni_bridge: OmniBridge) -> OmniBridge:
-    """Shorthand fixture for OMNI protobuf testing via Lua bridge."""
-    return omni_bridge
+def lua_bridge_clean(lua_bridge: LuaBridge, _lua_globals_snapshot: dict) -> LuaBridge:
+    """
+    Provide the shared Lua bridge, restoring its globals after the test.
+
+    Globals added by the test are removed and overwritten ones are put
+    back from the session snapshot, so tests that mutate Lua state do not
+    need reset_bridge() (which would re-parse tak.lua).
+    """
+    yield lua_bridge
+    restore_lua_globals(lua_bridge.lua, _lua_globals_snapshot)
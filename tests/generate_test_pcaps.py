@@ -6,9 +6,13 @@ Creates synthetic pcap files using existing test fixtures for validating
 the Wireshark Lua dissector plugins.
 """
 
+import itertools
 import os
+import struct
+import time
+from functools import lru_cache
 from pathlib import Path
-from scapy.all import Ether, IP, TCP, UDP, wrpcap, Raw
+from scapy.all import Ether, IP, TCP, UDP
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
@@ -29,27 +33,105 @@ SRC_IP = "192.168.1.100"
 DST_IP = "192.168.1.200"
 MCAST_IP = "239.2.3.1"
 
+# Ethernet link type for pcap output (DLT_EN10MB)
+LINKTYPE_ETHERNET = 1
+
+# Output buffer size for pcap writes (batch records instead of 4 KiB flushes)
+PCAP_BUFSZ = 1 << 20
+
+# Classic pcap file format (microsecond timestamps, version 2.4)
+PCAP_MAGIC = 0xA1B2C3D4
+PCAP_SNAPLEN = 65535
+_PCAP_FILE_HEADER = struct.Struct("<IHHiIII")
+_PCAP_RECORD_HEADER = struct.Struct("<IIII")
+
+# Header layout of the packet templates (no IP or TCP options)
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+ETH_HLEN = 14
+IP_HLEN = 20
+IP_LEN_OFF = ETH_HLEN + 2
+IP_CSUM_OFF = ETH_HLEN + 10
+IP_SRC_OFF = ETH_HLEN + 12
+L4_OFF = ETH_HLEN + IP_HLEN
+UDP_LEN_OFF = L4_OFF + 4
+UDP_CSUM_OFF = L4_OFF + 6
+TCP_CSUM_OFF = L4_OFF + 16
+
+
+def _checksum(data: bytes) -> int:
+    """Compute the 16-bit one's complement Internet checksum of data."""
+    if len(data) % 2:
+        data = bytes(data) + b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+@lru_cache(maxsize=None)
+def _packet_template(proto: int, src_ip: str, dst_ip: str) -> bytes:
+    """
+    Serialize an Ether/IP/TCP|UDP header stack once via scapy.
+
+    Subsequent packets reuse these bytes and only patch the fields that
+    depend on the payload and ports (see _build_packet).
+    """
+    if proto == IPPROTO_TCP:
+        l4 = TCP(sport=0, dport=0, flags="PA")
+    else:
+        l4 = UDP(sport=0, dport=0)
+    return bytes(Ether() / IP(src=src_ip, dst=dst_ip) / l4)
+
+
+def _build_packet(proto: int, payload: bytes, src_port: int, dst_port: int,
+                  src_ip: str, dst_ip: str) -> bytes:
+    """Splice payload into a cached header template and fix up lengths/checksums."""
+    buf = bytearray(_packet_template(proto, src_ip, dst_ip))
+    buf += payload
+    l4_len = len(buf) - L4_OFF
+
+    # IPv4 total length and header checksum
+    struct.pack_into("!H", buf, IP_LEN_OFF, IP_HLEN + l4_len)
+    struct.pack_into("!H", buf, IP_CSUM_OFF, 0)
+    struct.pack_into("!H", buf, IP_CSUM_OFF, _checksum(buf[ETH_HLEN:L4_OFF]))
+
+    # Ports are the first two fields of both TCP and UDP headers
+    struct.pack_into("!HH", buf, L4_OFF, src_port, dst_port)
+
+    if proto == IPPROTO_TCP:
+        csum_off = TCP_CSUM_OFF
+    else:
+        struct.pack_into("!H", buf, UDP_LEN_OFF, l4_len)
+        csum_off = UDP_CSUM_OFF
+
+    # Transport checksum over the IPv4 pseudo-header + segment
+    struct.pack_into("!H", buf, csum_off, 0)
+    pseudo = buf[IP_SRC_OFF:L4_OFF] + struct.pack("!BBH", 0, proto, l4_len)
+    csum = _checksum(pseudo + buf[L4_OFF:])
+    if proto == IPPROTO_UDP and csum == 0:
+        csum = 0xFFFF
+    struct.pack_into("!H", buf, csum_off, csum)
+
+    return bytes(buf)
+
 
 def create_tcp_packet(payload: bytes, src_port: int, dst_port: int,
-                      src_ip: str = SRC_IP, dst_ip: str = DST_IP) -> Ether:
-    """Create a TCP packet with given payload."""
-    return (
-        Ether() /
-        IP(src=src_ip, dst=dst_ip) /
-        TCP(sport=src_port, dport=dst_port, flags="PA") /
-        Raw(load=payload)
-    )
+                      src_ip: str = SRC_IP, dst_ip: str = DST_IP) -> bytes:
+    """Create a raw Ethernet TCP packet with given payload."""
+    return _build_packet(IPPROTO_TCP, payload, src_port, dst_port, src_ip, dst_ip)
 
 
 def create_udp_packet(payload: bytes, src_port: int, dst_port: int,
-                      src_ip: str = SRC_IP, dst_ip: str = DST_IP) -> Ether:
-    """Create a UDP packet with given payload."""
-    return (
-        Ether() /
-        IP(src=src_ip, dst=dst_ip) /
-        UDP(sport=src_port, dport=dst_port) /
-        Raw(load=payload)
-    )
+                      src_ip: str = SRC_IP, dst_ip: str = DST_IP) -> bytes:
+    """Create a raw Ethernet UDP packet with given payload."""
+    return _build_packet(IPPROTO_UDP, payload, src_port, dst_port, src_ip, dst_ip)
+
+
+# Fixed-layout byte runs written in place by the TAK message builders
+_PREFIX_INTO = struct.Struct("BB").pack_into
+_HDR4_INTO = struct.Struct("4B").pack_into
+_HDR5_INTO = struct.Struct("5B").pack_into
 
 
 def create_tak_stream_message(cot_type: str = "a-f-G", uid: str = "test-uid-123",
@@ -58,24 +140,26 @@ def create_tak_stream_message(cot_type: str = "a-f-G", uid: str = "test-uid-123"
     Create a TAK Stream protocol message (version 1).
     Format: 0xBF + varint_length + TakMessage protobuf
     """
-    # Build CotEvent protobuf manually
-    # Field 1 (type) - string
     type_bytes = cot_type.encode('utf-8')
-    cot_event = bytes([0x0A, len(type_bytes)]) + type_bytes
-
-    # Field 5 (uid) - string
     uid_bytes = uid.encode('utf-8')
-    cot_event += bytes([0x2A, len(uid_bytes)]) + uid_bytes
-
-    # Field 9 (how) - string
     how_bytes = how.encode('utf-8')
-    cot_event += bytes([0x4A, len(how_bytes)]) + how_bytes
 
-    # Wrap in TakMessage field 2 (CotEvent)
-    tak_message = bytes([0x12, len(cot_event)]) + cot_event
+    # CotEvent: field 1 (type), field 5 (uid), field 9 (how), each a
+    # string with a single-byte length
+    event_len = 6 + len(type_bytes) + len(uid_bytes) + len(how_bytes)
 
-    # TAK Stream format: 0xBF + length + message
-    return bytes([0xBF, len(tak_message)]) + tak_message
+    # TAK Stream format: 0xBF + length + TakMessage, where the TakMessage
+    # wraps the CotEvent in field 2. The total size is known up front, so
+    # write every field at its offset in one preallocated buffer.
+    buf = bytearray(4 + event_len)
+    _HDR4_INTO(buf, 0, 0xBF, 2 + event_len, 0x12, event_len)
+    offset = 4
+    for tag, value in ((0x0A, type_bytes), (0x2A, uid_bytes), (0x4A, how_bytes)):
+        _PREFIX_INTO(buf, offset, tag, len(value))
+        offset += 2
+        buf[offset:offset + len(value)] = value
+        offset += len(value)
+    return bytes(buf)
 
 
 def create_tak_mesh_message(version: int = 2, cot_type: str = "a-u-G",
@@ -84,30 +168,46 @@ def create_tak_mesh_message(version: int = 2, cot_type: str = "a-u-G",
     Create a TAK Mesh protocol message (version 2+).
     Format: 0xBF + version_varint + 0xBF + TakMessage protobuf
     """
-    # Build CotEvent protobuf
     type_bytes = cot_type.encode('utf-8')
-    cot_event = bytes([0x0A, len(type_bytes)]) + type_bytes
-
     uid_bytes = uid.encode('utf-8')
-    cot_event += bytes([0x2A, len(uid_bytes)]) + uid_bytes
 
-    # Wrap in TakMessage
-    tak_message = bytes([0x12, len(cot_event)]) + cot_event
+    # CotEvent: field 1 (type), field 5 (uid)
+    event_len = 4 + len(type_bytes) + len(uid_bytes)
 
-    # TAK Mesh format: 0xBF + version + 0xBF + message
-    return bytes([0xBF, version, 0xBF]) + tak_message
+    # TAK Mesh format: 0xBF + version + 0xBF + TakMessage (CotEvent in field 2)
+    buf = bytearray(5 + event_len)
+    _HDR5_INTO(buf, 0, 0xBF, version, 0xBF, 0x12, event_len)
+    offset = 5
+    for tag, value in ((0x0A, type_bytes), (0x2A, uid_bytes)):
+        _PREFIX_INTO(buf, offset, tag, len(value))
+        offset += 2
+        buf[offset:offset + len(value)] = value
+        offset += len(value)
+    return bytes(buf)
 
 
-def encode_varint(value: int) -> bytes:
-    """Encode an integer as a protobuf varint."""
-    result = []
-    while value > 127:
-        result.append((value & 0x7f) | 0x80)
+# Single-byte varints (0-127) encode to themselves
+_VARINT_LUT = tuple(bytes((i,)) for i in range(128))
+
+
+def _encode_varint_slow(value: int) -> bytes:
+    """Encode a multi-byte varint, sizing the output from bit_length()."""
+    nbytes = (value.bit_length() + 6) // 7
+    result = bytearray(nbytes)
+    for i in range(nbytes - 1):
+        result[i] = (value & 0x7f) | 0x80
         value >>= 7
-    result.append(value)
+    result[-1] = value
     return bytes(result)
 
 
+def encode_varint(value: int) -> bytes:
+    """Encode an integer as a protobuf varint."""
+    if 0 <= value < 128:
+        return _VARINT_LUT[value]
+    return _encode_varint_slow(value)
+
+
 def encode_protobuf_tag(field_num: int, wire_type: int = 2) -> bytes:
     """
     Encode a protobuf field tag.
@@ -117,6 +217,76 @@ def encode_protobuf_tag(field_num: int, wire_type: int = 2) -> bytes:
     return encode_varint(tag)
 
 
+_PREFIX = struct.Struct("BB").pack
+
+
+def _tag_length_prefix(tag: int, length: int) -> bytes:
+    """Encode a single-byte tag followed by a varint length."""
+    if length < 128:
+        return _PREFIX(tag, length)
+    return _VARINT_LUT[tag] + _encode_varint_slow(length)
+
+
+# Geopoint at lat 37.0, lon -110.0: fields 1 and 2 as fixed64 doubles
+# (tags (1 << 3) | 1 and (2 << 3) | 1), shared by Track and Image events
+_GEOPOINT_37_N110 = b"\x09" + struct.pack("<d", 37.0) + b"\x11" + struct.pack("<d", -110.0)
+
+
+def _length_delimited(field_num: int, payload: bytes) -> bytes:
+    """Encode a length-delimited protobuf field (tag + length + payload)."""
+    tag = (field_num << 3) | 2
+    if tag < 128:
+        return _tag_length_prefix(tag, len(payload)) + payload
+    return encode_varint(tag) + encode_varint(len(payload)) + payload
+
+
+# OMNI BaseEvent oneof MessageEvent by event type name:
+# (field number, event-specific sub-message body)
+_OMNI_EVENT_TABLE = {
+    # TrackEvent: field 2 is Geopoint
+    "Track": (12, _length_delimited(2, _GEOPOINT_37_N110)),
+    # PlayerEvent: field 3 is CommunicationParameters with callsign (field 1 string)
+    "Player": (13, _length_delimited(3, _length_delimited(1, b"ALPHA-1"))),
+    # SensorEvent: field 3, varint, value 1 (OPERATIONAL)
+    "Sensor": (14, b"\x18\x01"),
+    # ShapeEvent: field 1 empty SinglePoint, field 8 environment AIR (3)
+    "Shape": (15, b"\x0a\x00" + b"\x40\x03"),
+    # ChatEvent: field 1 is message string
+    "Chat": (16, _length_delimited(1, b"Test chat message")),
+    # MissionAssignmentEvent: field 1, varint, value 5 (COMBAT_AIR_PATROL)
+    "MissionAssignment": (17, b"\x08\x05"),
+    # WeatherEvent: field 1 is category, value 1
+    "Weather": (20, b"\x08\x01"),
+    # AirfieldStatusEvent: field 1 is ICAO code string
+    "AirfieldStatus": (22, _length_delimited(1, b"KDEN")),
+    # PersonnelRecoveryEvent: field 1, varint, value 4 (INITIATE)
+    "PersonnelRecovery": (23, b"\x08\x04"),
+    # EntityManagementEvent: field 1 empty Drop
+    "EntityManagement": (25, b"\x0a\x00"),
+    # NetworkManagementEvent: field 1 empty Ping
+    "NetworkManagement": (26, b"\x0a\x00"),
+    # NavigationVectorEvent: field 1 is course wrapper (double 90.0 degrees)
+    "NavigationVector": (29, _length_delimited(1, b"\x09" + struct.pack("<d", 90.0))),
+    # ImageEvent: field 2 is location geopoint
+    "Image": (36, _length_delimited(2, _GEOPOINT_37_N110)),
+    # AlertEvent: field 1 message, field 2 category CAT_2, field 6 type THREAT
+    "Alert": (37, _length_delimited(1, b"Test alert") + b"\x10\x02" + b"\x30\x09"),
+    # FlightPathEvent: field 4 is total_points wrapper (field 1 int32 value 5)
+    "FlightPath": (42, _length_delimited(4, b"\x08\x05")),
+}
+
+OMNI_EVENT_FIELD_NUMS = {
+    event_type: field_num for event_type, (field_num, _) in _OMNI_EVENT_TABLE.items()
+}
+
+# The oneof event field does not depend on entity_id/seq_num, so encode it
+# once per event type rather than on every create_omni_base_event call.
+_OMNI_EVENT_BYTES = {
+    event_type: _length_delimited(field_num, content)
+    for event_type, (field_num, content) in _OMNI_EVENT_TABLE.items()
+}
+
+
 def create_omni_base_event(entity_id: int = 12345678,
                            event_type: str = "Track",
                            seq_num: int = 1) -> bytes:
@@ -144,159 +314,66 @@ def create_omni_base_event(entity_id: int = 12345678,
         37: alert (AlertEvent)
         42: flight_path (FlightPathEvent)
     """
-    message = b""
-
-    # Field 1 (entity_id) - uint64 varint
-    # Tag = (1 << 3) | 0 = 0x08
-    message += bytes([0x08]) + encode_varint(entity_id)
-
-    # Field 9 (event_sequence_number) - uint64 varint
-    # Tag = (9 << 3) | 0 = 0x48
-    message += bytes([0x48]) + encode_varint(seq_num)
-
-    # Map event type names to field numbers
-    event_field_nums = {
-        "Track": 12,
-        "Player": 13,
-        "Sensor": 14,
-        "Shape": 15,
-        "Chat": 16,
-        "MissionAssignment": 17,
-        "Weather": 20,
-        "AirfieldStatus": 22,
-        "PersonnelRecovery": 23,
-        "EntityManagement": 25,
-        "NetworkManagement": 26,
-        "NavigationVector": 29,
-        "Image": 36,
-        "Alert": 37,
-        "FlightPath": 42,
-    }
+    # Field 1 (entity_id) - uint64 varint, tag (1 << 3) | 0 = 0x08
+    # Field 9 (event_sequence_number) - uint64 varint, tag (9 << 3) | 0 = 0x48
+    # followed by the precomputed oneof event field (empty if unknown type)
+    message = bytearray(b"\x08")
+    message += encode_varint(entity_id)
+    message.append(0x48)
+    message += encode_varint(seq_num)
+    message += _OMNI_EVENT_BYTES.get(event_type, b"")
+    return bytes(message)
 
-    field_num = event_field_nums.get(event_type)
-    if field_num is None:
-        return message
-
-    # Create event-specific content
-    event_content = b""
-
-    if event_type == "Track":
-        # TrackEvent: field 2 is Geopoint
-        # Create a simple geopoint with lat/lon
-        geopoint = b""
-        # Lat (field 1, double) - use fixed64 wire type (1)
-        geopoint += bytes([0x09])  # tag (1 << 3) | 1
-        geopoint += b'\x00\x00\x00\x00\x00\x80B@'  # 37.0 as little-endian double
-        # Lon (field 2, double)
-        geopoint += bytes([0x11])  # tag (2 << 3) | 1
-        geopoint += b'\x00\x00\x00\x00\x00\x80[\xc0'  # -110.0 as little-endian double
-        # Wrap geopoint in TrackEvent field 2
-        event_content = encode_protobuf_tag(2) + encode_varint(len(geopoint)) + geopoint
-
-    elif event_type == "Player":
-        # PlayerEvent: field 3 is CommunicationParameters with callsign
-        callsign = b"ALPHA-1"
-        comm_params = bytes([0x0A, len(callsign)]) + callsign  # field 1 string
-        event_content = encode_protobuf_tag(3) + encode_varint(len(comm_params)) + comm_params
-
-    elif event_type == "Sensor":
-        # SensorEvent: field 3 is status enum
-        event_content = bytes([0x18, 0x01])  # field 3, varint, value 1 (OPERATIONAL)
-
-    elif event_type == "Shape":
-        # ShapeEvent: field 1 is SinglePoint oneof, field 8 is environment enum
-        event_content = bytes([0x0A, 0x00])  # field 1 empty SinglePoint
-        event_content += bytes([0x40, 0x03])  # field 8, varint, value 3 (AIR)
-
-    elif event_type == "Chat":
-        # ChatEvent: field 1 is message string
-        msg = b"Test chat message"
-        event_content = bytes([0x0A, len(msg)]) + msg
-
-    elif event_type == "MissionAssignment":
-        # MissionAssignmentEvent: field 1 is mission type enum
-        event_content = bytes([0x08, 0x05])  # field 1, varint, value 5 (COMBAT_AIR_PATROL)
-
-    elif event_type == "Weather":
-        # WeatherEvent: field 1 is category
-        event_content = bytes([0x08, 0x01])  # field 1, varint, value 1
-
-    elif event_type == "AirfieldStatus":
-        # AirfieldStatusEvent: field 1 is ICAO code string
-        icao = b"KDEN"
-        event_content = bytes([0x0A, len(icao)]) + icao
-
-    elif event_type == "PersonnelRecovery":
-        # PersonnelRecoveryEvent: field 1 is PR type enum
-        event_content = bytes([0x08, 0x04])  # field 1, varint, value 4 (INITIATE)
-
-    elif event_type == "EntityManagement":
-        # EntityManagementEvent: field 1 is DropCommand oneof (empty message ok)
-        event_content = bytes([0x0A, 0x00])  # field 1 empty Drop
-
-    elif event_type == "NetworkManagement":
-        # NetworkManagementEvent: field 1 is Ping oneof
-        event_content = bytes([0x0A, 0x00])  # field 1 empty Ping
-
-    elif event_type == "NavigationVector":
-        # NavigationVectorEvent: field 1 is course wrapper
-        # Wrapper: field 1 is double value
-        course_wrapper = bytes([0x09]) + b'\x00\x00\x00\x00\x00\x80V@'  # 90.0 degrees
-        event_content = encode_protobuf_tag(1) + encode_varint(len(course_wrapper)) + course_wrapper
-
-    elif event_type == "Image":
-        # ImageEvent: field 2 is location geopoint
-        geopoint = bytes([0x09]) + b'\x00\x00\x00\x00\x00\x80B@'  # lat 37.0
-        geopoint += bytes([0x11]) + b'\x00\x00\x00\x00\x00\x80[\xc0'  # lon -110.0
-        event_content = encode_protobuf_tag(2) + encode_varint(len(geopoint)) + geopoint
-
-    elif event_type == "Alert":
-        # AlertEvent: field 1 is message, field 2 is category, field 6 is alert type
-        msg = b"Test alert"
-        event_content = bytes([0x0A, len(msg)]) + msg  # field 1 message
-        event_content += bytes([0x10, 0x02])  # field 2 category CAT_2
-        event_content += bytes([0x30, 0x09])  # field 6 type THREAT
-
-    elif event_type == "FlightPath":
-        # FlightPathEvent: field 4 is total_points wrapper
-        pts_wrapper = bytes([0x08, 0x05])  # field 1 int32 value 5
-        event_content = encode_protobuf_tag(4) + encode_varint(len(pts_wrapper)) + pts_wrapper
-
-    # Append the event type with its tag
-    tag = encode_protobuf_tag(field_num)
-    message += tag + encode_varint(len(event_content)) + event_content
-
-    return message
 
+def _read_file(entry: os.DirEntry) -> bytes:
+    """Read a small file with a single os.read sized from its stat."""
+    fd = os.open(entry.path, os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
 
-def generate_xml_cot_pcap():
-    """Generate pcap with XML CoT messages."""
-    packets = []
-    port_counter = 50000
 
-    # Load all COT examples
-    if COT_EXAMPLES.exists():
-        for cot_file in sorted(COT_EXAMPLES.glob("*.cot")):
-            xml_content = cot_file.read_text(encoding='utf-8').encode('utf-8')
+def _normalize_newlines(data: bytes) -> bytes:
+    """Translate CRLF and lone CR line endings to LF."""
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+@lru_cache(maxsize=1)
+def _load_cot_examples() -> tuple[tuple[str, bytes], ...]:
+    """
+    Load all COT example files as (name, bytes), sorted by filename.
+
+    Line endings are normalized to LF (the examples are stored with CRLF),
+    matching what a text-mode read would produce. Cached so the XML and
+    mixed pcap generators share a single read.
+    """
+    if not COT_EXAMPLES.exists():
+        return ()
+    with os.scandir(COT_EXAMPLES) as it:
+        entries = sorted(
+            (e for e in it if e.name.endswith(".cot") and e.is_file()),
+            key=lambda e: e.name,
+        )
+    return tuple((e.name, _normalize_newlines(_read_file(e))) for e in entries)
+
 
-            # Create TCP packet on default TAK port
-            pkt = create_tcp_packet(xml_content, port_counter, PORT_TAK_DEFAULT)
-            packets.append(pkt)
-            port_counter += 1
+def generate_xml_cot_pcap():
+    """Generate packets with XML CoT messages."""
+    ports = itertools.count(50000)
 
-            # Also create UDP variant on SA multicast port
-            pkt_udp = create_udp_packet(xml_content, port_counter, PORT_TAK_SA_MCAST,
-                                        dst_ip=MCAST_IP)
-            packets.append(pkt_udp)
-            port_counter += 1
+    for _name, xml_content in _load_cot_examples():
+        # Create TCP packet on default TAK port
+        yield create_tcp_packet(xml_content, next(ports), PORT_TAK_DEFAULT)
 
-    return packets
+        # Also create UDP variant on SA multicast port
+        yield create_udp_packet(xml_content, next(ports), PORT_TAK_SA_MCAST,
+                                dst_ip=MCAST_IP)
 
 
 def generate_tak_protobuf_pcap():
-    """Generate pcap with TAK protobuf messages (Stream and Mesh)."""
-    packets = []
-    port_counter = 51000
+    """Generate packets with TAK protobuf messages (Stream and Mesh)."""
+    ports = itertools.count(51000)
 
     # Stream protocol messages (version 1)
     stream_types = [
@@ -309,9 +386,7 @@ def generate_tak_protobuf_pcap():
 
     for cot_type, uid, how in stream_types:
         payload = create_tak_stream_message(cot_type, uid, how)
-        pkt = create_tcp_packet(payload, port_counter, PORT_TAK_SA_MCAST)
-        packets.append(pkt)
-        port_counter += 1
+        yield create_tcp_packet(payload, next(ports), PORT_TAK_SA_MCAST)
 
     # Mesh protocol messages (version 2+)
     mesh_configs = [
@@ -322,18 +397,13 @@ def generate_tak_protobuf_pcap():
 
     for version, cot_type, uid in mesh_configs:
         payload = create_tak_mesh_message(version, cot_type, uid)
-        pkt = create_udp_packet(payload, port_counter, PORT_TAK_SA_MCAST,
+        yield create_udp_packet(payload, next(ports), PORT_TAK_SA_MCAST,
                                 dst_ip=MCAST_IP)
-        packets.append(pkt)
-        port_counter += 1
-
-    return packets
 
 
 def generate_omni_pcap():
-    """Generate pcap with OMNI protobuf messages for all event types."""
-    packets = []
-    port_counter = 52000
+    """Generate packets with OMNI protobuf messages for all event types."""
+    ports = itertools.count(52000)
 
     # Create test packets for ALL OMNI event types
     omni_events = [
@@ -375,40 +445,55 @@ def generate_omni_pcap():
         (15001, "FlightPath", 1),
     ]
 
-    for entity_id, event_type, seq_num in omni_events:
-        payload = create_omni_base_event(entity_id, event_type, seq_num)
-
-        # TCP variant
-        pkt_tcp = create_tcp_packet(payload, port_counter, PORT_OMNI)
-        packets.append(pkt_tcp)
-        port_counter += 1
+    # Encode each event once; the TCP and UDP variants share the payload
+    payloads = [create_omni_base_event(entity_id, event_type, seq_num)
+                for entity_id, event_type, seq_num in omni_events]
 
-        # UDP variant
-        pkt_udp = create_udp_packet(payload, port_counter, PORT_OMNI)
-        packets.append(pkt_udp)
-        port_counter += 1
+    for payload in payloads:
+        yield create_tcp_packet(payload, next(ports), PORT_OMNI)
+        yield create_udp_packet(payload, next(ports), PORT_OMNI)
 
     # Include binary test asset if available
     if OMNI_ASSETS.exists():
         for bin_file in OMNI_ASSETS.glob("*.bin"):
             payload = bin_file.read_bytes()
-            pkt = create_tcp_packet(payload, port_counter, PORT_OMNI)
-            packets.append(pkt)
-            port_counter += 1
-
-    return packets
+            yield create_tcp_packet(payload, next(ports), PORT_OMNI)
 
 
 def generate_mixed_pcap():
-    """Generate pcap with mixed TAK/CoT/OMNI traffic."""
-    packets = []
+    """Generate packets with mixed TAK/CoT/OMNI traffic."""
+    return itertools.chain(
+        generate_xml_cot_pcap(),
+        generate_tak_protobuf_pcap(),
+        generate_omni_pcap(),
+    )
 
-    # Combine all packet types
-    packets.extend(generate_xml_cot_pcap())
-    packets.extend(generate_tak_protobuf_pcap())
-    packets.extend(generate_omni_pcap())
 
-    return packets
+def write_pcap(output_path: Path, packets) -> int:
+    """
+    Stream pre-serialized Ethernet frames into a pcap file.
+
+    The file and record headers are packed directly. Records are stamped
+    one microsecond apart from the current time, so capture order is kept.
+    No file is created when there are no packets. Returns the number of
+    packets written.
+    """
+    packets = iter(packets)
+    first = next(packets, None)
+    if first is None:
+        return 0
+    start_us = time.time_ns() // 1000
+    pack_record = _PCAP_RECORD_HEADER.pack
+    count = 0
+    with open(output_path, "wb", buffering=PCAP_BUFSZ) as f:
+        f.write(_PCAP_FILE_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0,
+                                       PCAP_SNAPLEN, LINKTYPE_ETHERNET))
+        for pkt in itertools.chain((first,), packets):
+            ts_sec, ts_usec = divmod(start_us + count, 1_000_000)
+            f.write(pack_record(ts_sec, ts_usec, len(pkt), len(pkt)))
+            f.write(pkt)
+            count += 1
+    return count
 
 
 def main():
@@ -427,10 +512,10 @@ def main():
     }
 
     for filename, packets in pcaps.items():
-        if packets:
-            output_path = OUTPUT_DIR / filename
-            wrpcap(str(output_path), packets)
-            print(f"  Created {filename}: {len(packets)} packets")
+        output_path = OUTPUT_DIR / filename
+        count = write_pcap(output_path, packets)
+        if count:
+            print(f"  Created {filename}: {count} packets")
         else:
             print(f"  Skipped {filename}: no packets generated")
 
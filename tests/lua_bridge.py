@@ -7,213 +7,569 @@ than Python reimplementations.
 """
 
 import struct
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 import lupa
 from lupa import LuaRuntime
 
+# Number of recently used bytes -> Tvb buffers each bridge keeps
+BUFFER_CACHE_SIZE = 64
+
+# Number of recently parsed bytes messages LuaBridge keeps Lua results for
+PARSE_CACHE_SIZE = 256
+
+
+# Flattens a pb.parse_message result into one multi-value return:
+# field_num, wire_type, count, value_1 .. value_count, field_num, ...
+# TvbRange values are converted with :string() on the Lua side when they
+# hold valid UTF-8; binary ones are passed through as TvbRange objects.
+_FLATTEN_FIELDS_LUA = """
+function(fields)
+    if fields == nil then return end
+    local out, n = {}, 0
+    for field_num, field in pairs(fields) do
+        local values = field.values or {}
+        local count = #values
+        out[n + 1] = field_num
+        out[n + 2] = field.wire_type
+        out[n + 3] = count
+        n = n + 3
+        for i = 1, count do
+            local v = values[i]
+            if type(v) == "table" and v.string then
+                local str = v:string()
+                if utf8.len(str) then
+                    v = str
+                end
+            end
+            out[n + i] = v
+        end
+        n = n + count
+    end
+    return table.unpack(out, 1, n)
+end
+"""
 
-class LuaBridge:
-    """Bridge to execute tak.lua code from Python tests."""
 
-    def __init__(self):
-        """Initialize Lua runtime and load tak.lua with mocks."""
-        self.lua = LuaRuntime(unpack_returned_tuples=True)
-        self._load_mocks()
-        self._load_tak_plugin()
+def _unflatten_fields(flat: tuple | None) -> dict:
+    """Rebuild the parse_message dict from the flattened Lua return values."""
+    result = {}
+    if not flat:
+        return result
+    pos = 0
+    end = len(flat)
+    while pos < end:
+        field_num, wire_type, count = flat[pos:pos + 3]
+        pos += 3
+        result[int(field_num)] = {'wire_type': int(wire_type),
+                                  'values': list(flat[pos:pos + count])}
+        pos += count
+    return result
+
+
+# Parses several whole messages in one call: for each message, the count
+# of its flattened values followed by those values
+_PARSE_MESSAGE_BATCH_LUA = """
+function(parse_message, flatten)
+    return function(buffers, lengths)
+        local out, n = {}, 0
+        for i = 1, #buffers do
+            local flat = table.pack(flatten(parse_message(buffers[i], 0, lengths[i])))
+            out[n + 1] = flat.n
+            table.move(flat, 1, flat.n, n + 2, out)
+            n = n + 1 + flat.n
+        end
+        return table.unpack(out, 1, n)
+    end
+end
+"""
+
+
+# Prefixes accepted by xml.is_xml in tak.lua (no leading whitespace)
+_XML_PREFIXES = ("<?xml", "<event")
+
+# Looks up several attributes in one call, returning the values in order
+_GET_ATTRS_LUA = """
+function(get_attr)
+    return function(s, names)
+        local n = #names
+        local out = {}
+        for i = 1, n do
+            out[i] = get_attr(s, names[i])
+        end
+        return table.unpack(out, 1, n)
+    end
+end
+"""
+
+
+# Decodes one varint per (buffer, offset) pair, returning value, length
+# for each pair in order as one flat multi-value result
+_DECODE_VARINT_BATCH_LUA = """
+function(decode_varint)
+    return function(buffers, offsets)
+        local n = #buffers
+        local out = {}
+        for i = 1, n do
+            out[2 * i - 1], out[2 * i] = decode_varint(buffers[i], offsets[i])
+        end
+        return table.unpack(out, 1, 2 * n)
+    end
+end
+"""
+
+
+# Returns the bytes of a TvbRange as integers, so binary payloads cross
+# into Python without a UTF-8 decode of the Lua string
+_RANGE_BYTES_LUA = """
+function(range)
+    return range:bytes():byte(1, -1)
+end
+"""
+
+
+def _as_bytes(values: tuple[int, ...] | int | None) -> bytes:
+    """Build bytes from the multi-value result of string.byte."""
+    if values is None:
+        return b""
+    if isinstance(values, int):
+        return bytes((values,))
+    return bytes(values)
+
+
+class PinnedBuffer:
+    """A Tvb built once from bytes and reused across several decode calls."""
+
+    __slots__ = ("tvb", "data")
+
+    def __init__(self, tvb: Any, data: bytes):
+        self.tvb = tvb
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+def _wrap(lua_fn: Any, none_result: tuple) -> Any:
+    """
+    Wrap a pb decoder so it always returns a tuple shaped like none_result.
+
+    lupa returns a tuple when unpack_returned_tuples=True; nil or a
+    malformed result maps to none_result, and a lone value to (value, 0).
+    """
+    arity = len(none_result)
+
+    def call(buffer: Any, offset: int) -> tuple:
+        result = lua_fn(buffer, offset)
+        if isinstance(result, tuple) and len(result) == arity:
+            return result
+        if result is None or arity != 2:
+            return none_result
+        return result, 0
+
+    return call
+
+
+# Little-endian layouts of the fixed-width protobuf wire types
+_FIXED32 = struct.Struct("<I")
+_FIXED64 = struct.Struct("<q")  # signed, like the Lua integer le_uint64 gives
+_FLOAT = struct.Struct("<f")
+_DOUBLE = struct.Struct("<d")
+
+
+# decode_tag results for every single-byte tag, indexed by the tag byte
+_ONE_BYTE_TAGS = tuple((tag >> 3, tag & 0x07, 1) for tag in range(0x80))
+
 
-    def _load_mocks(self):
-        """Load Wireshark API mocks."""
+def _decode_fixed(codec: struct.Struct, data: bytes, offset: int) -> tuple[Any, int]:
+    """Unpack a fixed-width value from Python bytes, as pb.decode_fixed* do."""
+    if offset + codec.size > len(data):
+        return None, 0
+    return codec.unpack_from(data, offset)[0], codec.size
+
+
+def _decode_varint(data: bytes, offset: int = 0) -> tuple[int | None, int]:
+    """
+    Decode a varint directly from Python bytes.
+
+    Mirrors pb.decode_varint in tak.lua (None, 0 on truncated or over-long
+    input) without building a Tvb or crossing into Lua.
+    """
+    end = len(data)
+    pos = offset
+    value = 0
+    shift = 0
+    while True:
+        if pos >= end:
+            return None, 0
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos - offset
+        if pos - offset > 10:
+            return None, 0
+        shift += 7
+
+
+# One Lua runtime shared by both bridges; the plugins export their pb
+# modules under distinct globals so they can coexist in the same _G
+_shared_lua: LuaRuntime | None = None
+
+
+def _get_runtime() -> LuaRuntime:
+    """Get or create the shared Lua runtime, loading the Wireshark mocks once."""
+    global _shared_lua
+    if _shared_lua is None:
+        _shared_lua = LuaRuntime(unpack_returned_tuples=True)
         mock_path = Path(__file__).parent / "wireshark_mock.lua"
         with open(mock_path, "r") as f:
-            mock_code = f.read()
-        self.lua.execute(mock_code)
+            _shared_lua.execute(f.read())
+    return _shared_lua
 
-    def _load_tak_plugin(self):
-        """Load tak.lua plugin code."""
-        plugin_path = Path(__file__).parent.parent / "tak.lua"
-        with open(plugin_path, "r") as f:
-            plugin_code = f.read()
 
-        # Modify the code to export the pb and xml modules to globals
-        # This allows us to access them after execution
-        modified_code = plugin_code + """
+# Appended to the plugin sources to export their modules to globals,
+# so they can be accessed after execution
+_TAK_EXPORTS = """
 
 -- Export modules for testing
-_G._test_pb = pb
+_G._test_pb_tak = pb
 _G._test_xml = xml
 """
-        self.lua.execute(modified_code)
 
-        # Get references to the Lua modules via the globals we created
-        self._pb = self.lua.eval("_test_pb")
-        self._xml = self.lua.eval("_test_xml")
-        self._tvb_class = self.lua.eval("Tvb")
+_OMNI_EXPORTS = """
 
-    def create_buffer(self, data: bytes | list[int]) -> Any:
-        """Create a Lua Tvb buffer from Python bytes or byte list."""
-        if isinstance(data, bytes):
-            data = list(data)
-        # Create Lua table from Python list
-        lua_table = self.lua.table(*data)
-        return self._tvb_class.new(lua_table)
+-- Export modules for testing
+_G._test_pb_omni = pb
+"""
 
-    # =========================================================================
-    # Protobuf Decoder Functions
-    # =========================================================================
 
-    def decode_varint(self, data: bytes, offset: int = 0) -> tuple[int | None, int]:
-        """Decode a varint from buffer at offset."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_varint(buffer, offset)
-        if result is None:
-            return None, 0
-        # lupa returns tuple when unpack_returned_tuples=True
-        if isinstance(result, tuple):
-            return result
-        return result, 0
+@lru_cache(maxsize=None)
+def _plugin_source(filename: str, exports: str) -> str:
+    """Read a plugin from the project root once, with its test exports appended."""
+    plugin_path = Path(__file__).parent.parent / filename
+    with open(plugin_path, "r") as f:
+        return f.read() + exports
 
-    def decode_sint(self, data: bytes, offset: int = 0) -> tuple[int | None, int]:
-        """Decode a signed varint (zigzag encoding)."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_sint(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
 
-    def decode_fixed32(self, data: bytes, offset: int = 0) -> tuple[int | None, int]:
-        """Decode a 32-bit fixed value."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_fixed32(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
+@lru_cache(maxsize=None)
+def _plugin_chunk(filename: str, exports: str) -> Any:
+    """
+    Compile a plugin into the shared runtime once.
 
-    def decode_fixed64(self, data: bytes, offset: int = 0) -> tuple[int | None, int]:
-        """Decode a 64-bit fixed value."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_fixed64(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
+    Calling the returned chunk runs the plugin without lexing and parsing
+    its source again, e.g. when a bridge is recreated after reset_bridge().
+    """
+    return _get_runtime().compile(_plugin_source(filename, exports))
 
-    def decode_float(self, data: bytes, offset: int = 0) -> tuple[float | None, int]:
-        """Decode a 32-bit float."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_float(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
 
-    def decode_double(self, data: bytes, offset: int = 0) -> tuple[float | None, int]:
-        """Decode a 64-bit double."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_double(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
+class LuaBridge:
+    """Bridge to execute tak.lua code from Python tests."""
 
-    def decode_tag(self, data: bytes, offset: int = 0) -> tuple[int | None, int | None, int]:
-        """Decode a protobuf field tag."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_tag(buffer, offset)
-        if result is None:
-            return None, None, 0
-        if isinstance(result, tuple) and len(result) == 3:
-            return result
-        return None, None, 0
+    def __init__(self):
+        """Load tak.lua into the shared Lua runtime."""
+        self.lua = _get_runtime()
+        self._buf_cache: OrderedDict[bytes, Any] = OrderedDict()
+        self._load_tak_plugin()
+        # Flattened results are tuples, so every caller still gets fresh
+        # dicts and lists from _unflatten_fields
+        self._parse_flat_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse_flat)
+
+    def _load_tak_plugin(self):
+        """Load tak.lua plugin code."""
+        _plugin_chunk("tak.lua", _TAK_EXPORTS)()
+
+        # Get references to the Lua modules via the globals we created
+        self._pb = self.lua.eval("_test_pb_tak")
+        self._xml = self.lua.eval("_test_xml")
+        self._tvb_class = self.lua.eval("Tvb")
+
+        # Wire type constants never change; read them from Lua once
+        self.WIRE_VARINT = int(self._pb.WIRE_VARINT)
+        self.WIRE_64BIT = int(self._pb.WIRE_64BIT)
+        self.WIRE_LENGTH_DELIMITED = int(self._pb.WIRE_LENGTH_DELIMITED)
+        self.WIRE_32BIT = int(self._pb.WIRE_32BIT)
+
+        # Decoders normalized to fixed-shape tuples, built once
+        self._lua_decode_varint = _wrap(self._pb.decode_varint, (None, 0))
+        self._lua_decode_sint = _wrap(self._pb.decode_sint, (None, 0))
+        self._lua_decode_fixed32 = _wrap(self._pb.decode_fixed32, (None, 0))
+        self._lua_decode_fixed64 = _wrap(self._pb.decode_fixed64, (None, 0))
+        self._lua_decode_float = _wrap(self._pb.decode_float, (None, 0))
+        self._lua_decode_double = _wrap(self._pb.decode_double, (None, 0))
+        self._lua_decode_tag = _wrap(self._pb.decode_tag, (None, None, 0))
+        self._lua_decode_length_delimited = _wrap(
+            self._pb.decode_length_delimited, (None, None, 0))
+        self._lua_range_bytes = self.lua.eval(_RANGE_BYTES_LUA)
+        self._lua_decode_varint_batch = self.lua.eval(_DECODE_VARINT_BATCH_LUA)(
+            self._pb.decode_varint)
+
+        # Other Lua entry points, resolved once instead of per call
+        self._lua_parse_message = self._pb.parse_message
+        self._lua_flatten_fields = self.lua.eval(_FLATTEN_FIELDS_LUA)
+        self._lua_parse_message_batch = self.lua.eval(_PARSE_MESSAGE_BATCH_LUA)(
+            self._lua_parse_message, self._lua_flatten_fields)
+        self._lua_get_attr = self._xml.get_attr
+        self._lua_get_attrs = self.lua.eval(_GET_ATTRS_LUA)(self._xml.get_attr)
+        self._lua_get_element = self._xml.get_element
+        self._lua_get_element_with_attrs = self._xml.get_element_with_attrs
+        self._lua_is_xml = self._xml.is_xml
+
+    @contextmanager
+    def buffer(self, data: bytes | list[int]) -> Iterator[PinnedBuffer]:
+        """
+        Build the Tvb for data once and pin it for a block of decode calls.
+
+        The yielded handle can be passed as the data argument of any
+        decode method or parse_message in place of the original bytes.
+        """
+        yield PinnedBuffer(self.create_buffer(data), bytes(data))
+
+    def create_buffer(self, data: bytes | bytearray | list[int] | PinnedBuffer) -> Any:
+        """
+        Create a Lua Tvb buffer from Python bytes or byte list.
+
+        Bytes are handed to Tvb.new as a Lua string (a single copy); byte
+        lists are copied into a Lua array. Tvbs are read-only, so buffers
+        built from bytes are cached (LRU) and reused when the same data is
+        decoded again.
+        """
+        if isinstance(data, PinnedBuffer):
+            return data.tvb
+        if isinstance(data, bytearray):
+            data = bytes(data)
+        if not isinstance(data, bytes):
+            return self._tvb_class.new(self.lua.table_from(data))
+        tvb = self._buf_cache.get(data)
+        if tvb is not None:
+            self._buf_cache.move_to_end(data)
+            return tvb
+        tvb = self._tvb_class.new(data)
+        self._buf_cache[data] = tvb
+        if len(self._buf_cache) > BUFFER_CACHE_SIZE:
+            self._buf_cache.popitem(last=False)
+        return tvb
+
+    # =========================================================================
+    # Protobuf Decoder Functions
+    # =========================================================================
+
+    def decode_varint(self, data: bytes, offset: int = 0, *,
+                      fast_path: bool = False) -> tuple[int | None, int]:
+        """
+        Decode a varint from buffer at offset.
+
+        With fast_path=True, bytes input is decoded in Python instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            # Most varints are a single byte: return it without looping
+            if offset < len(data) and data[offset] < 0x80:
+                return data[offset], 1
+            return _decode_varint(data, offset)
+        return self._lua_decode_varint(self.create_buffer(data), offset)
+
+    def decode_varint_batch(
+        self, items: Iterable[tuple[bytes, int]]
+    ) -> list[tuple[int | None, int]]:
+        """
+        Decode a varint from each (data, offset) pair in one Lua call.
+
+        Results are in input order and shaped like decode_varint's.
+        """
+        items = tuple(items)
+        if not items:
+            return []
+        buffers = self.lua.table_from([self.create_buffer(data) for data, _ in items])
+        offsets = self.lua.table_from([offset for _, offset in items])
+        flat = self._lua_decode_varint_batch(buffers, offsets)
+        if not isinstance(flat, tuple):
+            flat = (flat,)
+        flat += (None,) * (2 * len(items) - len(flat))
+        return [(flat[i], flat[i + 1] or 0) for i in range(0, len(flat), 2)]
+
+    def decode_sint(self, data: bytes, offset: int = 0, *,
+                    fast_path: bool = False) -> tuple[int | None, int]:
+        """
+        Decode a signed varint (zigzag encoding).
+
+        With fast_path=True, single-byte values in bytes input are decoded
+        in Python; longer ones still go through Lua.
+        """
+        if fast_path and isinstance(data, bytes) and offset < len(data) and data[offset] < 0x80:
+            value = data[offset]
+            return (value >> 1) ^ -(value & 1), 1
+        return self._lua_decode_sint(self.create_buffer(data), offset)
+
+    def decode_fixed32(self, data: bytes, offset: int = 0, *,
+                       fast_path: bool = False) -> tuple[int | None, int]:
+        """
+        Decode a 32-bit fixed value.
+
+        With fast_path=True, bytes input is unpacked with struct instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            return _decode_fixed(_FIXED32, data, offset)
+        return self._lua_decode_fixed32(self.create_buffer(data), offset)
+
+    def decode_fixed64(self, data: bytes, offset: int = 0, *,
+                       fast_path: bool = False) -> tuple[int | None, int]:
+        """
+        Decode a 64-bit fixed value.
+
+        With fast_path=True, bytes input is unpacked with struct instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            return _decode_fixed(_FIXED64, data, offset)
+        return self._lua_decode_fixed64(self.create_buffer(data), offset)
+
+    def decode_float(self, data: bytes, offset: int = 0, *,
+                     fast_path: bool = False) -> tuple[float | None, int]:
+        """
+        Decode a 32-bit float.
+
+        With fast_path=True, bytes input is unpacked with struct instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            return _decode_fixed(_FLOAT, data, offset)
+        return self._lua_decode_float(self.create_buffer(data), offset)
+
+    def decode_double(self, data: bytes, offset: int = 0, *,
+                      fast_path: bool = False) -> tuple[float | None, int]:
+        """
+        Decode a 64-bit double.
+
+        With fast_path=True, bytes input is unpacked with struct instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            return _decode_fixed(_DOUBLE, data, offset)
+        return self._lua_decode_double(self.create_buffer(data), offset)
+
+    def decode_tag(self, data: bytes, offset: int = 0, *,
+                   fast_path: bool = False) -> tuple[int | None, int | None, int]:
+        """
+        Decode a protobuf field tag.
+
+        With fast_path=True, single-byte tags (field numbers up to 15) in
+        bytes input are decoded in Python; longer ones still go through Lua.
+        """
+        if fast_path and isinstance(data, bytes) and offset < len(data) and data[offset] < 0x80:
+            return _ONE_BYTE_TAGS[data[offset]]
+        return self._lua_decode_tag(self.create_buffer(data), offset)
 
     def decode_length_delimited(
         self, data: bytes, offset: int = 0
     ) -> tuple[bytes | None, int | None, int]:
         """Decode a length-delimited field."""
         buffer = self.create_buffer(data)
-        result = self._pb.decode_length_delimited(buffer, offset)
-        if result is None:
-            return None, None, 0
-        if isinstance(result, tuple) and len(result) == 3:
-            lua_data, length, total_bytes = result
-            if lua_data is not None:
-                # Convert TvbRange to bytes - need to call Lua method correctly
-                try:
-                    # lua_data is a TvbRange, call its string method
-                    str_result = lua_data.string(lua_data)  # Pass self explicitly
-                    if isinstance(str_result, str):
-                        return str_result.encode(), length, total_bytes
-                    elif isinstance(str_result, bytes):
-                        return str_result, length, total_bytes
-                    return str_result, length, total_bytes
-                except Exception:
-                    return None, length, total_bytes
+        lua_data, length, total_bytes = self._lua_decode_length_delimited(buffer, offset)
+        if lua_data is None:
             return None, length, total_bytes
-        return None, None, 0
-
-    def parse_message(self, data: bytes, offset: int = 0, length: int | None = None) -> dict:
-        """Parse all fields from a protobuf message."""
+        # Fetch the TvbRange as raw byte values; going through :string()
+        # would UTF-8 decode it and fail on binary payloads
+        return _as_bytes(self._lua_range_bytes(lua_data)), length, total_bytes
+
+    def _parse_message_py(self, data: bytes, offset: int, length: int) -> dict:
+        """
+        Walk a message's fields in Python with pb.parse_message's dispatch.
+
+        Length-delimited values are returned as str when they are valid
+        UTF-8 and as bytes otherwise, matching the Lua path's conversion.
+        fixed64 values are signed, as the Lua integers pb.decode_fixed64
+        returns are.
+        """
+        fields = {}
+        end_offset = offset + length
+        size = len(data)
+        pos = offset
+        while pos < end_offset:
+            tag, tag_len = _decode_varint(data, pos)
+            if tag is None:
+                break
+            field_num = tag >> 3
+            wire_type = tag & 0x07
+            pos += tag_len
+
+            if wire_type == self.WIRE_VARINT:
+                value, field_len = _decode_varint(data, pos)
+            elif wire_type == self.WIRE_64BIT:
+                value, field_len = _decode_fixed(_FIXED64, data, pos)
+            elif wire_type == self.WIRE_LENGTH_DELIMITED:
+                value = None
+                field_len = 0
+                data_len, varint_len = _decode_varint(data, pos)
+                if data_len is not None and pos + varint_len + data_len <= size:
+                    start = pos + varint_len
+                    value = data[start:start + data_len]
+                    try:
+                        value = value.decode("utf-8")
+                    except UnicodeDecodeError:
+                        pass
+                    field_len = varint_len + data_len
+            elif wire_type == self.WIRE_32BIT:
+                value, field_len = _decode_fixed(_FIXED32, data, pos)
+            else:
+                break
+
+            if field_len == 0:
+                break
+            pos += field_len
+
+            field = fields.get(field_num)
+            if field is None:
+                field = fields[field_num] = {'wire_type': wire_type, 'values': []}
+            field['values'].append(value)
+        return fields
+
+    def parse_message(self, data: bytes, offset: int = 0, length: int | None = None, *,
+                      fast_path: bool = False) -> dict:
+        """
+        Parse all fields from a protobuf message.
+
+        With fast_path=True, bytes input is scanned in Python instead of by
+        pb.parse_message; binary length-delimited values come back as bytes
+        rather than TvbRange objects.
+        """
         if length is None:
             length = len(data) - offset
-        buffer = self.create_buffer(data)
-        lua_fields = self._pb.parse_message(buffer, offset, length)
-
-        # Convert Lua table to Python dict
-        result = {}
-        if lua_fields:
-            # Iterate over Lua table using lupa's iteration
-            for field_num, field_data in lua_fields.items():
-                if field_num is not None and field_data is not None:
-                    # Access wire_type from the Lua table
-                    wire_type = field_data["wire_type"]
-                    values = []
-
-                    # Access values array from the Lua table
-                    lua_values = field_data["values"]
-                    if lua_values:
-                        # Iterate using lupa's values() for array-like tables
-                        for v in lua_values.values():
-                            if v is None:
-                                break
-                            # Convert TvbRange to string if needed
-                            if hasattr(v, 'string'):
-                                try:
-                                    values.append(v.string(v))  # Pass self explicitly
-                                except Exception:
-                                    values.append(v)
-                            else:
-                                values.append(v)
-
-                    result[int(field_num)] = {'wire_type': int(wire_type), 'values': values}
-        return result
-
-    # =========================================================================
-    # Wire Type Constants
-    # =========================================================================
-
-    @property
-    def WIRE_VARINT(self) -> int:
-        return int(self._pb.WIRE_VARINT)
-
-    @property
-    def WIRE_64BIT(self) -> int:
-        return int(self._pb.WIRE_64BIT)
-
-    @property
-    def WIRE_LENGTH_DELIMITED(self) -> int:
-        return int(self._pb.WIRE_LENGTH_DELIMITED)
-
-    @property
-    def WIRE_32BIT(self) -> int:
-        return int(self._pb.WIRE_32BIT)
+        if isinstance(data, bytes):
+            if fast_path:
+                return self._parse_message_py(data, offset, length)
+            return _unflatten_fields(self._parse_flat_cached(data, offset, length))
+        return _unflatten_fields(self._parse_flat(data, offset, length))
+
+    def _parse_flat(self, data: Any, offset: int, length: int) -> tuple | None:
+        """Run pb.parse_message and return its fields flattened into a tuple."""
+        lua_fields = self._lua_parse_message(self.create_buffer(data), offset, length)
+        # One Lua call returns every field and value, instead of iterating
+        # the nested Lua tables from Python
+        return self._lua_flatten_fields(lua_fields)
+
+    def parse_message_batch(self, messages: Iterable[bytes]) -> list[dict]:
+        """Parse several whole messages with one Lua call, in input order."""
+        messages = tuple(messages)
+        if not messages:
+            return []
+        buffers = self.lua.table_from([self.create_buffer(data) for data in messages])
+        lengths = self.lua.table_from([len(data) for data in messages])
+        flat = self._lua_parse_message_batch(buffers, lengths)
+        if not isinstance(flat, tuple):
+            flat = (flat,)
+        results = []
+        pos = 0
+        for _ in messages:
+            count = flat[pos]
+            results.append(_unflatten_fields(flat[pos + 1:pos + 1 + count]))
+            pos += 1 + count
+        return results
 
     # =========================================================================
     # XML Parser Functions
@@ -221,132 +577,145 @@ _G._test_xml = xml
 
     def xml_get_attr(self, xml_str: str, attr_name: str) -> str | None:
         """Extract attribute value from XML string."""
-        result = self._xml.get_attr(xml_str, attr_name)
+        result = self._lua_get_attr(xml_str, attr_name)
         return result if result else None
 
+    def xml_get_attrs(self, xml_str: str, attr_names: Iterable[str]) -> dict[str, str | None]:
+        """Extract several attribute values from one XML string in a single Lua call."""
+        names = tuple(attr_names)
+        if not names:
+            return {}
+        values = self._lua_get_attrs(xml_str, self.lua.table_from(names))
+        if len(names) == 1:
+            values = (values,)
+        return {name: value if value else None for name, value in zip(names, values)}
+
     def xml_get_element(self, xml_str: str, elem_name: str) -> str | None:
         """Extract element content from XML string."""
-        result = self._xml.get_element(xml_str, elem_name)
+        result = self._lua_get_element(xml_str, elem_name)
         return result if result else None
 
     def xml_get_element_with_attrs(self, xml_str: str, elem_name: str) -> str | None:
         """Extract element with attributes from XML string."""
-        result = self._xml.get_element_with_attrs(xml_str, elem_name)
+        result = self._lua_get_element_with_attrs(xml_str, elem_name)
         return result if result else None
 
-    def xml_is_xml(self, data: str) -> bool:
-        """Check if string appears to be XML."""
-        return bool(self._xml.is_xml(data))
+    def xml_is_xml(self, data: str, *, fast_path: bool = False) -> bool:
+        """
+        Check if string appears to be XML.
+
+        With fast_path=True the check is a Python str.startswith against the
+        same prefixes as xml.is_xml, without calling into Lua.
+        """
+        if fast_path and isinstance(data, str):
+            return data.startswith(_XML_PREFIXES)
+        return bool(self._lua_is_xml(data))
 
 
 class OmniBridge:
     """Bridge to execute omni.lua code from Python tests."""
 
     def __init__(self):
-        """Initialize Lua runtime and load omni.lua with mocks."""
-        self.lua = LuaRuntime(unpack_returned_tuples=True)
-        self._load_mocks()
+        """Load omni.lua into the shared Lua runtime."""
+        self.lua = _get_runtime()
+        self._buf_cache: OrderedDict[bytes, Any] = OrderedDict()
         self._load_omni_plugin()
 
-    def _load_mocks(self):
-        """Load Wireshark API mocks."""
-        mock_path = Path(__file__).parent / "wireshark_mock.lua"
-        with open(mock_path, "r") as f:
-            mock_code = f.read()
-        self.lua.execute(mock_code)
-
     def _load_omni_plugin(self):
         """Load omni.lua plugin code."""
-        plugin_path = Path(__file__).parent.parent / "omni.lua"
-        with open(plugin_path, "r") as f:
-            plugin_code = f.read()
-
-        # Modify the code to export the pb module to globals
-        modified_code = plugin_code + """
-
--- Export modules for testing
-_G._test_pb = pb
-"""
-        self.lua.execute(modified_code)
+        _plugin_chunk("omni.lua", _OMNI_EXPORTS)()
 
         # Get references to the Lua modules
-        self._pb = self.lua.eval("_test_pb")
+        self._pb = self.lua.eval("_test_pb_omni")
         self._tvb_class = self.lua.eval("Tvb")
 
-    def create_buffer(self, data: bytes | list[int]) -> Any:
-        """Create a Lua Tvb buffer from Python bytes or byte list."""
-        if isinstance(data, bytes):
-            data = list(data)
-        lua_table = self.lua.table(*data)
-        return self._tvb_class.new(lua_table)
+        # Wire type constants never change; read them from Lua once
+        self.WIRE_VARINT = int(self._pb.WIRE_VARINT)
+        self.WIRE_64BIT = int(self._pb.WIRE_64BIT)
+        self.WIRE_LENGTH_DELIMITED = int(self._pb.WIRE_LENGTH_DELIMITED)
+        self.WIRE_32BIT = int(self._pb.WIRE_32BIT)
+
+        # Decoders normalized to fixed-shape tuples, built once
+        self._lua_decode_varint = _wrap(self._pb.decode_varint, (None, 0))
+        self._lua_decode_tag = _wrap(self._pb.decode_tag, (None, None, 0))
+        self._lua_parse_message = self._pb.parse_message
+        self._lua_flatten_fields = self.lua.eval(_FLATTEN_FIELDS_LUA)
+
+    @contextmanager
+    def buffer(self, data: bytes | list[int]) -> Iterator[PinnedBuffer]:
+        """
+        Build the Tvb for data once and pin it for a block of decode calls.
+
+        The yielded handle can be passed as the data argument of any
+        decode method or parse_message in place of the original bytes.
+        """
+        yield PinnedBuffer(self.create_buffer(data), bytes(data))
+
+    def create_buffer(self, data: bytes | bytearray | list[int] | PinnedBuffer) -> Any:
+        """
+        Create a Lua Tvb buffer from Python bytes or byte list.
+
+        Bytes are handed to Tvb.new as a Lua string (a single copy); byte
+        lists are copied into a Lua array. Tvbs are read-only, so buffers
+        built from bytes are cached (LRU) and reused when the same data is
+        decoded again.
+        """
+        if isinstance(data, PinnedBuffer):
+            return data.tvb
+        if isinstance(data, bytearray):
+            data = bytes(data)
+        if not isinstance(data, bytes):
+            return self._tvb_class.new(self.lua.table_from(data))
+        tvb = self._buf_cache.get(data)
+        if tvb is not None:
+            self._buf_cache.move_to_end(data)
+            return tvb
+        tvb = self._tvb_class.new(data)
+        self._buf_cache[data] = tvb
+        if len(self._buf_cache) > BUFFER_CACHE_SIZE:
+            self._buf_cache.popitem(last=False)
+        return tvb
 
     # =========================================================================
     # Protobuf Decoder Functions
     # =========================================================================
 
-    def decode_varint(self, data: bytes, offset: int = 0) -> tuple[int | None, int]:
-        """Decode a varint from buffer at offset."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_varint(buffer, offset)
-        if result is None:
-            return None, 0
-        if isinstance(result, tuple):
-            return result
-        return result, 0
-
-    def decode_tag(self, data: bytes, offset: int = 0) -> tuple[int | None, int | None, int]:
-        """Decode a protobuf field tag."""
-        buffer = self.create_buffer(data)
-        result = self._pb.decode_tag(buffer, offset)
-        if result is None:
-            return None, None, 0
-        if isinstance(result, tuple) and len(result) == 3:
-            return result
-        return None, None, 0
+    def decode_varint(self, data: bytes, offset: int = 0, *,
+                      fast_path: bool = False) -> tuple[int | None, int]:
+        """
+        Decode a varint from buffer at offset.
+
+        With fast_path=True, bytes input is decoded in Python instead of
+        by the Lua implementation.
+        """
+        if fast_path and isinstance(data, bytes):
+            # Most varints are a single byte: return it without looping
+            if offset < len(data) and data[offset] < 0x80:
+                return data[offset], 1
+            return _decode_varint(data, offset)
+        return self._lua_decode_varint(self.create_buffer(data), offset)
+
+    def decode_tag(self, data: bytes, offset: int = 0, *,
+                   fast_path: bool = False) -> tuple[int | None, int | None, int]:
+        """
+        Decode a protobuf field tag.
+
+        With fast_path=True, single-byte tags (field numbers up to 15) in
+        bytes input are decoded in Python; longer ones still go through Lua.
+        """
+        if fast_path and isinstance(data, bytes) and offset < len(data) and data[offset] < 0x80:
+            return _ONE_BYTE_TAGS[data[offset]]
+        return self._lua_decode_tag(self.create_buffer(data), offset)
 
     def parse_message(self, data: bytes, offset: int = 0, length: int | None = None) -> dict:
         """Parse all fields from a protobuf message."""
         if length is None:
             length = len(data) - offset
         buffer = self.create_buffer(data)
-        lua_fields = self._pb.parse_message(buffer, offset, length)
-
-        result = {}
-        if lua_fields:
-            for field_num, field_data in lua_fields.items():
-                if field_num is not None and field_data is not None:
-                    wire_type = field_data["wire_type"]
-                    values = []
-                    lua_values = field_data["values"]
-                    if lua_values:
-                        for v in lua_values.values():
-                            if v is None:
-                                break
-                            if hasattr(v, 'string'):
-                                try:
-                                    values.append(v.string(v))
-                                except Exception:
-                                    values.append(v)
-                            else:
-                                values.append(v)
-                    result[int(field_num)] = {'wire_type': int(wire_type), 'values': values}
-        return result
-
-    @property
-    def WIRE_VARINT(self) -> int:
-        return int(self._pb.WIRE_VARINT)
-
-    @property
-    def WIRE_64BIT(self) -> int:
-        return int(self._pb.WIRE_64BIT)
-
-    @property
-    def WIRE_LENGTH_DELIMITED(self) -> int:
-        return int(self._pb.WIRE_LENGTH_DELIMITED)
-
-    @property
-    def WIRE_32BIT(self) -> int:
-        return int(self._pb.WIRE_32BIT)
+        lua_fields = self._lua_parse_message(buffer, offset, length)
+        # One Lua call returns every field and value, instead of iterating
+        # the nested Lua tables from Python
+        return _unflatten_fields(self._lua_flatten_fields(lua_fields))
 
 
 # Singleton instances
@@ -371,7 +740,32 @@ def get_omni_bridge() -> OmniBridge:
 
 
 def reset_bridge():
-    """Reset the Lua bridge (useful for test isolation)."""
+    """
+    Reset the Lua bridges (useful for test isolation).
+
+    The shared runtime and its mocks are kept; the next get_bridge() or
+    get_omni_bridge() call reloads the plugin into it.
+    """
     global _bridge, _omni_bridge
     _bridge = None
     _omni_bridge = None
+
+
+def snapshot_lua_globals(lua: LuaRuntime) -> dict:
+    """Copy the runtime's global table into a dict."""
+    return dict(lua.globals().items())
+
+
+def restore_lua_globals(lua: LuaRuntime, snapshot: dict) -> None:
+    """
+    Put the runtime's globals back to a snapshot.
+
+    Globals added since the snapshot are removed and overwritten ones are
+    restored, without reloading the plugins.
+    """
+    lua_globals = lua.globals()
+    for key in list(lua_globals.keys()):
+        if key not in snapshot:
+            lua_globals[key] = None
+    for key, value in snapshot.items():
+        lua_globals[key] = value
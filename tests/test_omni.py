@@ -6,12 +6,13 @@ as implemented in tak.lua for entity_id, EventOrigin, TimeOfValidity,
 Alias, and event type identification.
 """
 
-import struct
 import pytest
 
 
 # OMNI detection - first bytes that indicate OMNI protobuf
-OMNI_FIRST_BYTES = [0x08, 0x10, 0x1A, 0x22]
+OMNI_FIRST_BYTES = frozenset((0x08, 0x10, 0x1A, 0x22))
+# Membership of every byte value in OMNI_FIRST_BYTES, indexed by the byte
+_OMNI_FIRST_BYTE_FLAGS = tuple(b in OMNI_FIRST_BYTES for b in range(256))
 
 
 def is_omni_protobuf(data: bytes) -> bool:
@@ -23,7 +24,7 @@ def is_omni_protobuf(data: bytes) -> bool:
     """
     if len(data) < 1:
         return False
-    return data[0] in OMNI_FIRST_BYTES
+    return _OMNI_FIRST_BYTE_FLAGS[data[0]]
 
 
 # OMNI event type mapping (from tak.lua omni_event_types)
@@ -46,10 +47,52 @@ OMNI_EVENT_TYPES = {
     42: "FlightPath",
 }
 
+# OMNI_EVENT_TYPES indexed directly by field number, "Unknown" in the gaps
+_OMNI_TYPE_TABLE = tuple(OMNI_EVENT_TYPES.get(i, "Unknown")
+                         for i in range(max(OMNI_EVENT_TYPES) + 1))
+
 
 def get_event_type_name(field_number: int) -> str:
     """Get OMNI event type name from oneof field number."""
-    return OMNI_EVENT_TYPES.get(field_number, "Unknown")
+    if 0 <= field_number < len(_OMNI_TYPE_TABLE):
+        return _OMNI_TYPE_TABLE[field_number]
+    return "Unknown"
+
+
+def field_tag(field_number: int, wire_type: int) -> int:
+    """Compute a protobuf field tag value."""
+    return (field_number << 3) | wire_type
+
+
+# Tag values of the length-delimited event type oneof fields
+_TAG_TRACK = 0x62    # field 12
+_TAG_PLAYER = 0x6A   # field 13
+_TAG_SENSOR = 0x72   # field 14
+_TAG_SHAPE = 0x7A    # field 15
+_TAG_CHAT = 130      # field 16, encoded as the two-byte varint 0x82 0x01
+
+
+def _with_entity_id(tag: int, payload: bytes) -> bytes:
+    """Encode a BaseEvent with entity_id = 1 and one length-delimited field."""
+    return bytes([0x08, 0x01, tag, len(payload)]) + payload
+
+
+# Sample BaseEvent encodings, built once at import
+_BASE_EVENT_MINIMAL = bytes([
+    0x08, 0x01,  # entity_id = 1
+    0x48, 0x0A,  # event_sequence_number = 10
+])
+# field 2 (origin): EventOrigin with source_uid = "test-device"
+_BASE_EVENT_WITH_ORIGIN = _with_entity_id(0x12, bytes([0x0A, 11]) + b"test-device")
+# field 4 (time): TimeOfValidity with updated = 1000ms, timeout = 2000ms
+_BASE_EVENT_WITH_TIME = _with_entity_id(0x22, bytes([0x10, 0xE8, 0x07, 0x18, 0xD0, 0x0F]))
+# field 5 (aliases): Alias with domain = "CoT", id = "test"
+_BASE_EVENT_WITH_ALIAS = _with_entity_id(0x2A, bytes([
+    0x0A, 0x03, 0x43, 0x6F, 0x54,
+    0x22, 0x04, 0x74, 0x65, 0x73, 0x74,
+]))
+# field 12 (track): placeholder TrackEvent
+_BASE_EVENT_WITH_TRACK = _with_entity_id(_TAG_TRACK, bytes([0x08, 0x01]))
 
 
 class TestOMNIProtocolDetection:
@@ -120,10 +163,7 @@ class TestBaseEventParsing:
     def test_base_event_structure(self):
         """Verify complete BaseEvent structure."""
         # Minimal BaseEvent with entity_id and sequence number
-        base_event = bytes([
-            0x08, 0x01,  # entity_id = 1
-            0x48, 0x0A,  # event_sequence_number = 10
-        ])
+        base_event = _BASE_EVENT_MINIMAL
 
         # Field 1 tag
         assert base_event[0] == 0x08
@@ -157,14 +197,8 @@ class TestEventOriginParsing:
     @pytest.mark.req("REQ-OMNI-002")
     def test_event_origin_in_base_event(self):
         """Verify EventOrigin is field 2 in BaseEvent."""
-        source_uid = b"test-device"
-        origin = bytes([0x0A, len(source_uid)]) + source_uid
-
         # BaseEvent field 2, wire type 2 -> 0x12
-        base_event = bytes([
-            0x08, 0x01,  # entity_id
-            0x12, len(origin),  # origin field
-        ]) + origin
+        base_event = _BASE_EVENT_WITH_ORIGIN
 
         assert base_event[2] == 0x12
 
@@ -191,13 +225,8 @@ class TestTimeOfValidityParsing:
     @pytest.mark.req("REQ-OMNI-003")
     def test_time_of_validity_in_base_event(self):
         """Verify TimeOfValidity is field 4 in BaseEvent."""
-        tov = bytes([0x10, 0xE8, 0x07, 0x18, 0xD0, 0x0F])
-
         # BaseEvent field 4, wire type 2 -> 0x22
-        base_event = bytes([
-            0x08, 0x01,  # entity_id
-            0x22, len(tov),  # time field
-        ]) + tov
+        base_event = _BASE_EVENT_WITH_TIME
 
         assert base_event[2] == 0x22
 
@@ -240,16 +269,8 @@ class TestAliasParsing:
     @pytest.mark.req("REQ-OMNI-004")
     def test_alias_in_base_event(self):
         """Verify Alias is field 5 (repeated) in BaseEvent."""
-        alias = bytes([
-            0x0A, 0x03, 0x43, 0x6F, 0x54,  # domain = "CoT"
-            0x22, 0x04, 0x74, 0x65, 0x73, 0x74,  # id = "test"
-        ])
-
         # BaseEvent field 5, wire type 2 -> 0x2A
-        base_event = bytes([
-            0x08, 0x01,  # entity_id
-            0x2A, len(alias),  # aliases field
-        ]) + alias
+        base_event = _BASE_EVENT_WITH_ALIAS
 
         assert base_event[2] == 0x2A
 
@@ -261,7 +282,7 @@ class TestTrackEventParsing:
     def test_track_event_field_number(self):
         """Verify TrackEvent is oneof field 12."""
         # Field 12, wire type 2 -> (12 << 3) | 2 = 0x62
-        assert (12 << 3) | 2 == 0x62
+        assert field_tag(12, 2) == _TAG_TRACK
 
     @pytest.mark.req("REQ-OMNI-005")
     def test_track_event_type_name(self):
@@ -271,15 +292,9 @@ class TestTrackEventParsing:
     @pytest.mark.req("REQ-OMNI-005")
     def test_track_event_in_base_event(self):
         """Verify TrackEvent is correctly placed in BaseEvent."""
-        # Minimal TrackEvent (just a placeholder)
-        track_event = bytes([0x08, 0x01])  # Some inner field
-
-        base_event = bytes([
-            0x08, 0x01,  # entity_id
-            0x62, len(track_event),  # track event field
-        ]) + track_event
+        base_event = _BASE_EVENT_WITH_TRACK
 
-        assert base_event[2] == 0x62
+        assert base_event[2] == _TAG_TRACK
 
 
 class TestPlayerEventParsing:
@@ -289,7 +304,7 @@ class TestPlayerEventParsing:
     def test_player_event_field_number(self):
         """Verify PlayerEvent is oneof field 13."""
         # Field 13, wire type 2 -> (13 << 3) | 2 = 0x6A
-        assert (13 << 3) | 2 == 0x6A
+        assert field_tag(13, 2) == _TAG_PLAYER
 
     @pytest.mark.req("REQ-OMNI-006")
     def test_player_event_type_name(self):
@@ -316,7 +331,7 @@ class TestChatEventParsing:
         """Verify ChatEvent is oneof field 16."""
         # Field 16, wire type 2 -> (16 << 3) | 2 = 0x82 0x01
         # For field numbers > 15, tag requires 2 bytes
-        assert (16 << 3) | 2 == 130  # 0x82 in single-byte would be > 127
+        assert field_tag(16, 2) == _TAG_CHAT  # 0x82 in single-byte would be > 127
 
     @pytest.mark.req("REQ-OMNI-007")
     def test_chat_event_type_name(self):
@@ -346,29 +361,27 @@ class TestEventTypeIdentification:
     """Tests for REQ-OMNI-008: Event type identification."""
 
     @pytest.mark.req("REQ-OMNI-008")
-    def test_all_event_types_mapped(self):
+    @pytest.mark.parametrize("field_num,expected_name", [
+        (11, "Other"),
+        (12, "Track"),
+        (13, "Player"),
+        (14, "Sensor"),
+        (15, "Shape"),
+        (16, "Chat"),
+        (17, "MissionAssignment"),
+        (20, "Weather"),
+        (22, "AirfieldStatus"),
+        (23, "PersonnelRecovery"),
+        (25, "EntityManagement"),
+        (26, "NetworkManagement"),
+        (29, "NavigationVector"),
+        (36, "Image"),
+        (37, "Alert"),
+        (42, "FlightPath"),
+    ])
+    def test_all_event_types_mapped(self, field_num, expected_name):
         """Verify all known event types are mapped."""
-        expected_types = [
-            (11, "Other"),
-            (12, "Track"),
-            (13, "Player"),
-            (14, "Sensor"),
-            (15, "Shape"),
-            (16, "Chat"),
-            (17, "MissionAssignment"),
-            (20, "Weather"),
-            (22, "AirfieldStatus"),
-            (23, "PersonnelRecovery"),
-            (25, "EntityManagement"),
-            (26, "NetworkManagement"),
-            (29, "NavigationVector"),
-            (36, "Image"),
-            (37, "Alert"),
-            (42, "FlightPath"),
-        ]
-
-        for field_num, expected_name in expected_types:
-            assert get_event_type_name(field_num) == expected_name
+        assert get_event_type_name(field_num) == expected_name
 
     @pytest.mark.req("REQ-OMNI-008")
     def test_unknown_event_type(self):
@@ -377,19 +390,16 @@ class TestEventTypeIdentification:
         assert get_event_type_name(0) == "Unknown"
 
     @pytest.mark.req("REQ-OMNI-008")
-    def test_event_type_field_tags(self):
+    @pytest.mark.parametrize("field_num,expected_tag", [
+        (12, _TAG_TRACK),
+        (13, _TAG_PLAYER),
+        (14, _TAG_SENSOR),
+        (15, _TAG_SHAPE),
+    ])
+    def test_event_type_field_tags(self, field_num, expected_tag):
         """Verify event type field tags are correct."""
         # Each event type has field number that maps to specific tag
-        event_tags = {
-            12: 0x62,  # Track: (12 << 3) | 2
-            13: 0x6A,  # Player: (13 << 3) | 2
-            14: 0x72,  # Sensor: (14 << 3) | 2
-            15: 0x7A,  # Shape: (15 << 3) | 2
-        }
-
-        for field_num, expected_tag in event_tags.items():
-            calculated_tag = (field_num << 3) | 2
-            assert calculated_tag == expected_tag
+        assert field_tag(field_num, 2) == expected_tag
 
 
 class TestOMNIBinaryFixture:
@@ -15,6 +15,23 @@ import pytest
 # Ensure lua_bridge can be imported
 sys.path.insert(0, str(Path(__file__).parent))
 from lua_bridge import LuaBridge
+from varint_cases import VARINT_TEST_CASES
+
+
+# Bound little-endian packers for fixed-width protobuf values
+_PACK_DOUBLE = struct.Struct("<d").pack
+_PACK_FLOAT = struct.Struct("<f").pack
+_PACK_FIXED64 = struct.Struct("<Q").pack
+_PACK_FIXED32 = struct.Struct("<I").pack
+
+# Fixed-width test values and their encodings, packed once at import
+_TIMESTAMP_MS = 1608148774913  # milliseconds since epoch
+_FIXED32_VALUE = 12345678
+_FLOAT_PI = 3.14159
+_DOUBLE_ZERO_BYTES = _PACK_DOUBLE(0.0)
+_TIMESTAMP_BYTES = _PACK_FIXED64(_TIMESTAMP_MS)
+_FIXED32_BYTES = _PACK_FIXED32(_FIXED32_VALUE)
+_FLOAT_PI_BYTES = _PACK_FLOAT(_FLOAT_PI)  # truncated to single precision
 
 
 class TestVarintDecoding:
@@ -54,12 +71,43 @@ class TestVarintDecoding:
         assert result[0] is None or result[1] == 0
 
     @pytest.mark.req("REQ-PB-001")
-    def test_decode_varint_test_cases(self, pb: LuaBridge, varint_test_cases):
+    @pytest.mark.parametrize("varint_case", VARINT_TEST_CASES,
+                             ids=[data.hex() for data, _, _ in VARINT_TEST_CASES])
+    def test_decode_varint_test_cases(self, varint_case, varint_batch_results):
         """Verify all varint test cases from fixture via Lua."""
-        for data, expected_value, expected_bytes in varint_test_cases:
-            value, bytes_consumed = pb.decode_varint(data)
-            assert value == expected_value, f"Expected {expected_value}, got {value}"
-            assert bytes_consumed == expected_bytes
+        data, expected_value, expected_bytes = varint_case
+        value, bytes_consumed = varint_batch_results[data]
+        assert value == expected_value, f"Expected {expected_value}, got {value}"
+        assert bytes_consumed == expected_bytes
+
+    @pytest.mark.req("REQ-PB-001")
+    def test_decode_varint_fast_path_matches_lua(self, pb: LuaBridge, varint_test_cases):
+        """Verify the Python varint fast path agrees with the Lua decoder."""
+        for data, _, _ in varint_test_cases:
+            assert pb.decode_varint(data, fast_path=True) == pb.decode_varint(data)
+        assert pb.decode_varint(bytes([0xFF, 0xFF, 0xAC, 0x02]), 2, fast_path=True) == (300, 2)
+        assert pb.decode_varint(bytes([0x80]), fast_path=True) == (None, 0)
+        assert pb.decode_varint(bytes([0x80] * 11 + [0x01]), fast_path=True) == (None, 0)
+
+    @pytest.mark.req("REQ-PB-001")
+    def test_decode_varint_batch(self, pb: LuaBridge, varint_test_cases):
+        """Verify one batched Lua call decodes every varint like single calls."""
+        items = [(data, 0) for data, _, _ in varint_test_cases]
+        items += [(bytes([0xFF, 0xFF, 0xAC, 0x02]), 2), (bytes([0x80]), 0)]
+        results = pb.decode_varint_batch(items)
+
+        expected = [(value, consumed) for _, value, consumed in varint_test_cases]
+        assert results[:len(expected)] == expected
+        assert results[-2] == (300, 2)
+        assert results[-1] == pb.decode_varint(bytes([0x80]))
+        assert pb.decode_varint_batch([]) == []
+
+    @pytest.mark.req("REQ-PB-001")
+    def test_encode_varint_rejects_negative(self):
+        """Verify the pcap generator's varint encoder rejects negative values."""
+        gen = pytest.importorskip("generate_test_pcaps")
+        with pytest.raises(ValueError):
+            gen.encode_varint(-1)
 
     @pytest.mark.req("REQ-PB-001")
     def test_decode_sint_positive(self, pb: LuaBridge):
@@ -76,6 +124,13 @@ class TestVarintDecoding:
         assert pb.decode_sint(bytes([0x01])) == (-1, 1)  # -1 encodes to 1
         assert pb.decode_sint(bytes([0x03])) == (-2, 1)  # -2 encodes to 3
 
+    @pytest.mark.req("REQ-PB-001")
+    def test_decode_sint_fast_path_matches_lua(self, pb: LuaBridge):
+        """Verify the single-byte zigzag fast path agrees with the Lua decoder."""
+        for value in (0x00, 0x01, 0x02, 0x03, 0x7E, 0x7F):
+            data = bytes([value])
+            assert pb.decode_sint(data, fast_path=True) == pb.decode_sint(data)
+
 
 class TestDoubleDecoding:
     """Tests for REQ-PB-002: 64-bit fixed (double) decoding via actual Lua code."""
@@ -83,43 +138,41 @@ class TestDoubleDecoding:
     @pytest.mark.req("REQ-PB-002")
     def test_decode_double_zero(self, pb: LuaBridge):
         """Verify zero is decoded correctly by Lua."""
-        data = struct.pack("<d", 0.0)
+        data = _DOUBLE_ZERO_BYTES
         value, consumed = pb.decode_double(data)
         assert consumed == 8
         assert value == 0.0
 
     @pytest.mark.req("REQ-PB-002")
-    def test_decode_double_coordinate(self, pb: LuaBridge):
+    def test_decode_double_coordinate(self, pb: LuaBridge, lat_blob):
         """Verify coordinate-like double is decoded correctly by Lua."""
         lat = 38.85606343062312
-        data = struct.pack("<d", lat)
-        value, consumed = pb.decode_double(data)
+        value, consumed = pb.decode_double(lat_blob)
         assert consumed == 8
-        assert value == pytest.approx(lat, rel=1e-10)
+        assert value == lat
 
     @pytest.mark.req("REQ-PB-002")
-    def test_decode_double_negative(self, pb: LuaBridge):
+    def test_decode_double_negative(self, pb: LuaBridge, lon_blob):
         """Verify negative double is decoded correctly by Lua."""
         lon = -77.0563755018233
-        data = struct.pack("<d", lon)
-        value, consumed = pb.decode_double(data)
+        value, consumed = pb.decode_double(lon_blob)
         assert consumed == 8
-        assert value == pytest.approx(lon, rel=1e-10)
+        assert value == lon
 
     @pytest.mark.req("REQ-PB-002")
     def test_decode_fixed64_unsigned(self, pb: LuaBridge):
         """Verify 64-bit unsigned integer is decoded by Lua."""
-        timestamp = 1608148774913  # milliseconds since epoch
-        data = struct.pack("<Q", timestamp)
+        timestamp = _TIMESTAMP_MS
+        data = _TIMESTAMP_BYTES
         value, consumed = pb.decode_fixed64(data)
         assert consumed == 8
-        assert value == pytest.approx(timestamp, rel=1e-10)
+        assert value == timestamp
 
     @pytest.mark.req("REQ-PB-002")
     def test_decode_fixed32(self, pb: LuaBridge):
         """Verify 32-bit fixed integer is decoded by Lua."""
-        test_val = 12345678
-        data = struct.pack("<I", test_val)
+        test_val = _FIXED32_VALUE
+        data = _FIXED32_BYTES
         value, consumed = pb.decode_fixed32(data)
         assert consumed == 4
         assert value == test_val
@@ -127,12 +180,29 @@ class TestDoubleDecoding:
     @pytest.mark.req("REQ-PB-002")
     def test_decode_float(self, pb: LuaBridge):
         """Verify 32-bit float is decoded by Lua."""
-        test_val = 3.14159
-        data = struct.pack("<f", test_val)
+        test_val = _FLOAT_PI
+        data = _FLOAT_PI_BYTES
         value, consumed = pb.decode_float(data)
         assert consumed == 4
         assert value == pytest.approx(test_val, rel=1e-5)
 
+    @pytest.mark.req("REQ-PB-002")
+    def test_fixed_width_fast_path_matches_lua(self, pb: LuaBridge):
+        """Verify the struct-based fixed-width fast paths agree with Lua."""
+        data = _PACK_DOUBLE(39.7392) + _PACK_FLOAT(-1.5)
+        assert pb.decode_double(data, fast_path=True) == pb.decode_double(data)
+        assert pb.decode_fixed64(data, fast_path=True) == pb.decode_fixed64(data)
+        assert pb.decode_float(data, 8, fast_path=True) == pb.decode_float(data, 8)
+        assert pb.decode_fixed32(data, 8, fast_path=True) == pb.decode_fixed32(data, 8)
+        assert pb.decode_double(data, 8, fast_path=True) == (None, 0)
+
+        # fixed64 values with the high bit set come back from Lua as
+        # negative 64-bit integers
+        high = _PACK_FIXED64(2**63 + 5) + b"\xff" * 8
+        assert pb.decode_fixed64(high, fast_path=True) == pb.decode_fixed64(high)
+        assert pb.decode_fixed64(high, 8, fast_path=True) == pb.decode_fixed64(high, 8)
+        assert pb.decode_fixed32(high, 8, fast_path=True) == pb.decode_fixed32(high, 8)
+
 
 class TestLengthDelimitedDecoding:
     """Tests for REQ-PB-003: Length-delimited field decoding via actual Lua code."""
@@ -172,6 +242,17 @@ class TestLengthDelimitedDecoding:
         assert length == 6
         assert field_data == inner_message
 
+    @pytest.mark.req("REQ-PB-003")
+    def test_decode_binary_payload(self, pb: LuaBridge):
+        """Verify non-UTF-8 payloads come back byte-for-byte from Lua."""
+        payload = bytes([0xFF, 0x00, 0x80, 0xC3])
+        data = bytes([len(payload)]) + payload
+
+        field_data, length, total = pb.decode_length_delimited(data)
+        assert length == 4
+        assert total == 5
+        assert field_data == payload
+
     @pytest.mark.req("REQ-PB-003")
     def test_decode_insufficient_data(self, pb: LuaBridge):
         """Verify error handling when data is truncated by Lua."""
@@ -230,6 +311,13 @@ class TestTagDecoding:
         assert wire_type == pb.WIRE_LENGTH_DELIMITED
         assert consumed == 2
 
+    @pytest.mark.req("REQ-PB-004")
+    def test_decode_tag_fast_path_matches_lua(self, pb: LuaBridge):
+        """Verify the single-byte tag fast path agrees with the Lua decoder."""
+        for data in (bytes([0x08]), bytes([0x11]), bytes([0x1A]), bytes([0x25]),
+                     bytes([0xA2, 0x06])):
+            assert pb.decode_tag(data, fast_path=True) == pb.decode_tag(data)
+
 
 class TestMessageParsing:
     """Tests for complete message parsing via actual Lua code."""
@@ -267,8 +355,8 @@ class TestMessageParsing:
         # - Field 10 (lat) = double
         # - Field 11 (lon) = double
         message = (
-            bytes([0x51]) + struct.pack("<d", lat) +   # Field 10 (lat)
-            bytes([0x59]) + struct.pack("<d", lon)     # Field 11 (lon)
+            bytes([0x51]) + _PACK_DOUBLE(lat) +   # Field 10 (lat)
+            bytes([0x59]) + _PACK_DOUBLE(lon)     # Field 11 (lon)
         )
 
         fields = pb.parse_message(message)
@@ -309,26 +397,95 @@ class TestMessageParsing:
         assert len(fields[1]['values']) == 3
         assert fields[1]['values'] == [1, 2, 3]
 
+    @pytest.mark.req("REQ-PB-005")
+    def test_pinned_buffer_reused_across_calls(self, pb: LuaBridge):
+        """Verify a pinned buffer decodes the same as the raw bytes via Lua."""
+        data = bytes([0x08, 0x96, 0x01, 0x12, 0x02, 0x68, 0x69])
+        with pb.buffer(data) as buf:
+            assert pb.decode_tag(buf) == pb.decode_tag(data)
+            assert pb.decode_varint(buf, 1) == (150, 2)
+            assert pb.parse_message(buf) == pb.parse_message(data)
 
-class TestWireTypeConstants:
-    """Tests for wire type constant definitions in Lua."""
+    @pytest.mark.req("REQ-PB-006")
+    def test_parse_message_cached_results_independent(self, pb: LuaBridge):
+        """Verify re-parsing a cached message returns a fresh, equal dict."""
+        message = bytes([0x08, 0x01, 0x08, 0x02])
+        first = pb.parse_message(message)
+        first[1]['values'].append(99)
+        assert pb.parse_message(message) == {1: {'wire_type': pb.WIRE_VARINT, 'values': [1, 2]}}
 
-    @pytest.mark.req("REQ-PB-004")
-    def test_wire_type_varint(self, pb: LuaBridge):
-        """Verify WIRE_VARINT constant is 0."""
-        assert pb.WIRE_VARINT == 0
+    @pytest.mark.req("REQ-PB-005")
+    def test_parse_message_batch(self, pb: LuaBridge):
+        """Verify one batched Lua call parses each message like parse_message."""
+        messages = [
+            bytes([0x0A, 0x04]) + b"test" + bytes([0x10, 0x2A]),
+            bytes([0x51]) + _PACK_DOUBLE(38.85606343062312),
+            bytes([0x0A, 0x07, 0x0A, 0x05]) + b"inner",
+            bytes([0x08, 0x01, 0x08, 0x02, 0x08, 0x03]),
+            b"",
+        ]
+        assert pb.parse_message_batch(messages) == [pb.parse_message(m) for m in messages]
+        assert pb.parse_message_batch([]) == []
 
-    @pytest.mark.req("REQ-PB-004")
-    def test_wire_type_64bit(self, pb: LuaBridge):
-        """Verify WIRE_64BIT constant is 1."""
-        assert pb.WIRE_64BIT == 1
+    @pytest.mark.req("REQ-PB-005")
+    def test_parse_message_fast_path_matches_lua(self, pb: LuaBridge):
+        """Verify the Python field scan agrees with Lua's pb.parse_message."""
+        message = (
+            bytes([0x0A, 0x04]) + b"test" +           # Field 1: string "test"
+            bytes([0x10, 0xAC, 0x02]) +               # Field 2: varint 300
+            bytes([0x10, 0x01]) +                     # Field 2: varint 1 (repeated)
+            bytes([0x1D]) + _PACK_FIXED32(7) +        # Field 3: fixed32 7
+            bytes([0x21]) + _PACK_FIXED64(9) +        # Field 4: fixed64 9
+            bytes([0x21]) + b"\xff" * 8 +             # Field 4: fixed64 -1 (high bit)
+            bytes([0x31]) + _PACK_FIXED64(2**63) +    # Field 6: fixed64 -2**63
+            bytes([0x2A, 0x05]) + b"abc"              # Field 5: truncated string
+        )
+        for offset, length in ((0, None), (6, None), (0, 6)):
+            assert (pb.parse_message(message, offset, length, fast_path=True)
+                    == pb.parse_message(message, offset, length))
 
-    @pytest.mark.req("REQ-PB-004")
-    def test_wire_type_length_delimited(self, pb: LuaBridge):
-        """Verify WIRE_LENGTH_DELIMITED constant is 2."""
-        assert pb.WIRE_LENGTH_DELIMITED == 2
+        fields = pb.parse_message(message, fast_path=True)
+        assert fields[4]['values'] == [9, -1]
+        assert fields[6]['values'] == [-2**63]
+
+
+class TestBridgeIsolation:
+    """
+    Tests for restoring the shared Lua runtime's globals.
+
+    These run in order: the first mutates Lua state through
+    lua_bridge_clean and the second checks that its teardown undid it.
+    """
+
+    @pytest.mark.req("REQ-PB-001")
+    def test_lua_bridge_clean_mutates_globals(self, lua_bridge_clean: LuaBridge):
+        """Add and overwrite Lua globals for lua_bridge_clean to restore."""
+        lua = lua_bridge_clean.lua
+        lua.execute('_test_added_global = 1; _test_pb_tak = "overwritten"')
+        assert lua.globals()["_test_added_global"] == 1
+        assert lua.globals()["_test_pb_tak"] == "overwritten"
+
+    @pytest.mark.req("REQ-PB-001")
+    def test_lua_bridge_clean_restored_globals(self, lua_bridge: LuaBridge):
+        """Verify the previous test's globals were removed or restored."""
+        lua = lua_bridge.lua
+        lua_globals = lua.globals()
+        rawequal = lua.eval("rawequal")
+        assert lua_globals["_test_added_global"] is None
+        assert rawequal(lua_globals["_test_pb_tak"], lua_bridge._pb)
+        assert lua_bridge.decode_varint(bytes([0x96, 0x01])) == (150, 2)
+
+
+class TestWireTypeConstants:
+    """Tests for wire type constant definitions in Lua."""
 
     @pytest.mark.req("REQ-PB-004")
-    def test_wire_type_32bit(self, pb: LuaBridge):
-        """Verify WIRE_32BIT constant is 5."""
-        assert pb.WIRE_32BIT == 5
+    @pytest.mark.parametrize("name,value", [
+        ("WIRE_VARINT", 0),
+        ("WIRE_64BIT", 1),
+        ("WIRE_LENGTH_DELIMITED", 2),
+        ("WIRE_32BIT", 5),
+    ])
+    def test_wire_type_constants(self, pb: LuaBridge, name, value):
+        """Verify each WIRE_* constant has its protobuf wire type value."""
+        assert getattr(pb, name) == value
@@ -10,77 +10,106 @@ import struct
 import pytest
 
 
+# Bound little-endian double packer/unpacker for fixed-width protobuf values
+_PACK_DOUBLE = struct.Struct("<d").pack
+_UNPACK_DOUBLE_FROM = struct.Struct("<d").unpack_from
+# Five tagged doubles (CotEvent lat, lon, hae, ce, le) in one pack call
+_PACK_POINT_FIELDS = struct.Struct("<BdBdBdBdBd").pack
+# Two tagged doubles (Track speed, course)
+_PACK_TRACK_FIELDS = struct.Struct("<BdBd").pack
+
+
+def _field(tag: int, payload: bytes) -> bytes:
+    """Encode a length-delimited field (single-byte tag and length)."""
+    return b"".join((bytes((tag, len(payload))), payload))
+
+
 # TAK protocol detection constants
 TAK_MAGIC_BYTE = 0xBF
+_TAK_MAGIC = bytes((TAK_MAGIC_BYTE,))
+
+# Continuation bits of eight varint bytes read as one little-endian word
+_VARINT_MSBS = 0x8080808080808080
+# Maps bytes that end a varint (continuation bit clear) to 0, others to 1
+_VARINT_END_TABLE = bytes(0 if b < 0x80 else 1 for b in range(256))
+
 
+def _pack_varint_groups(word: int) -> int:
+    """Pack the 7-bit groups of up to eight little-endian varint bytes."""
+    # Pairwise: 8 x 7 -> 4 x 14 -> 2 x 28 -> 1 x 56 bits
+    word &= 0x7F7F7F7F7F7F7F7F
+    word = (word & 0x007F007F007F007F) | ((word & 0x7F007F007F007F00) >> 1)
+    word = (word & 0x00003FFF00003FFF) | ((word & 0x3FFF00003FFF0000) >> 2)
+    return (word & 0x000000000FFFFFFF) | ((word & 0x0FFFFFFF00000000) >> 4)
 
-def is_tak_stream(data: bytes) -> bool:
+
+def _read_varint(data: bytes | memoryview, pos: int) -> tuple[int, int]:
+    """
+    Decode the varint at pos, returning (value, position after it).
+
+    Up to eight bytes are decoded at once from a single little-endian
+    word: the first clear continuation bit gives the length, and the
+    7-bit groups are packed together with masks and shifts. A varint
+    running off the end of data consumes the rest of it.
+    """
+    chunk = data[pos:pos + 8]
+    word = int.from_bytes(chunk, "little")
+    stops = ~word & (_VARINT_MSBS >> (8 * (8 - len(chunk))))
+    nbytes = (stops & -stops).bit_length() // 8 if stops else len(chunk)
+    value = _pack_varint_groups(word & ((1 << (8 * nbytes)) - 1))
+    pos += nbytes
+    if stops or nbytes < 8:
+        return value, pos
+    # Longer than eight bytes: locate the last byte with one translate/find
+    # scan, then pack the rest eight bytes at a time
+    end = bytes(data[pos:]).translate(_VARINT_END_TABLE).find(b"\x00")
+    end = len(data) if end < 0 else pos + end + 1
+    shift = 56
+    for start in range(pos, end, 8):
+        word = int.from_bytes(data[start:min(start + 8, end)], "little")
+        value |= _pack_varint_groups(word) << shift
+        shift += 56
+    return value, end
+
+
+def is_tak_stream(data: bytes | memoryview) -> bool:
     """
     Check if data is TAK Stream protocol (version 1).
     Format: 0xBF + varint_length + payload
     Mirrors tak.lua stream detection.
     """
-    if len(data) < 2:
-        return False
-    if data[0] != TAK_MAGIC_BYTE:
+    data = memoryview(data)  # slices below are views, not copies
+    if len(data) < 2 or data[:1] != _TAK_MAGIC:
         return False
     # Next should be a varint length, then payload (no second magic byte)
     # Check that position after varint doesn't have another magic byte
-    pos = 1
-    # Decode varint to find where payload starts
-    value = 0
-    shift = 0
-    while pos < len(data):
-        byte = data[pos]
-        value |= (byte & 0x7F) << shift
-        shift += 7
-        pos += 1
-        if (byte & 0x80) == 0:
-            break
+    _, pos = _read_varint(data, 1)
     # If next byte after varint is not magic byte, it's stream protocol
-    if pos < len(data) and data[pos] != TAK_MAGIC_BYTE:
-        return True
-    return False
+    return data[pos:pos + 1] not in (b"", _TAK_MAGIC)
 
 
-def is_tak_mesh(data: bytes) -> bool:
+def is_tak_mesh(data: bytes | memoryview) -> bool:
     """
     Check if data is TAK Mesh protocol (version 2+).
     Format: 0xBF + version_varint + 0xBF + payload
     Mirrors tak.lua mesh detection.
     """
-    if len(data) < 3:
-        return False
-    if data[0] != TAK_MAGIC_BYTE:
+    data = memoryview(data)  # slices below are views, not copies
+    if len(data) < 3 or data[:1] != _TAK_MAGIC:
         return False
     # Decode version varint
-    pos = 1
-    while pos < len(data):
-        byte = data[pos]
-        pos += 1
-        if (byte & 0x80) == 0:
-            break
+    _, pos = _read_varint(data, 1)
     # Check for second magic byte
-    if pos < len(data) and data[pos] == TAK_MAGIC_BYTE:
-        return True
-    return False
+    return data[pos:pos + 1] == _TAK_MAGIC
 
 
-def get_tak_version(data: bytes) -> int | None:
+def get_tak_version(data: bytes | memoryview) -> int | None:
     """Extract TAK protocol version from mesh message."""
+    data = memoryview(data)
     if not is_tak_mesh(data):
         return None
     # Decode version varint after first magic byte
-    pos = 1
-    value = 0
-    shift = 0
-    while pos < len(data):
-        byte = data[pos]
-        value |= (byte & 0x7F) << shift
-        shift += 7
-        pos += 1
-        if (byte & 0x80) == 0:
-            break
+    value, _ = _read_varint(data, 1)
     return value
 
 
@@ -124,6 +153,15 @@ class TestTAKProtocolDetection:
         assert is_tak_mesh(data)
         assert get_tak_version(data) == 3
 
+    @pytest.mark.req("REQ-DET-004")
+    def test_mesh_multi_byte_version(self):
+        """Verify multi-byte version varints are decoded, including past 8 bytes."""
+        mesh = bytes([0xBF, 0xAC, 0x02, 0xBF, 0x08, 0x01])
+        assert get_tak_version(mesh) == 300
+        assert get_tak_version(memoryview(mesh)) == 300
+        long_version = bytes([0xFF] * 8 + [0x01])  # 2**57 - 1, nine bytes
+        assert get_tak_version(bytes([0xBF]) + long_version + bytes([0xBF])) == 2**57 - 1
+
     @pytest.mark.req("REQ-DET-003")
     @pytest.mark.req("REQ-DET-004")
     def test_not_tak_protocol(self):
@@ -184,11 +222,11 @@ class TestTakControlParsing:
     def test_tak_control_with_contact_uid(self):
         """Verify TakControl with contactUid field."""
         contact_uid = b"ANDROID-test123"
-        tak_control = bytes([
-            0x08, 0x01,  # minProtoVersion = 1
-            0x10, 0x02,  # maxProtoVersion = 2
-            0x1A, len(contact_uid),  # Field 3 (contactUid): string
-        ]) + contact_uid
+        tak_control = b"".join((
+            b"\x08\x01",  # minProtoVersion = 1
+            b"\x10\x02",  # maxProtoVersion = 2
+            _field(0x1A, contact_uid),  # Field 3 (contactUid): string
+        ))
 
         assert 0x1A in tak_control  # Field 3 tag present
 
@@ -200,9 +238,7 @@ class TestCotEventParsing:
     def test_cot_event_type_field(self):
         """Verify CotEvent type field (field 1) parsing."""
         event_type = b"a-f-G-U-C"
-        cot_event = bytes([
-            0x0A, len(event_type),  # Field 1 (type): string
-        ]) + event_type
+        cot_event = _field(0x0A, event_type)  # Field 1 (type): string
 
         assert cot_event[0] == 0x0A  # Field 1, length-delimited
         assert cot_event[2:2+len(event_type)] == event_type
@@ -212,9 +248,7 @@ class TestCotEventParsing:
         """Verify CotEvent uid field (field 5) parsing."""
         uid = b"ANDROID-device-id"
         # Field 5, wire type 2 -> (5 << 3) | 2 = 0x2A
-        cot_event = bytes([
-            0x2A, len(uid),
-        ]) + uid
+        cot_event = _field(0x2A, uid)
 
         assert cot_event[0] == 0x2A
 
@@ -223,9 +257,7 @@ class TestCotEventParsing:
         """Verify CotEvent how field (field 9) parsing."""
         how = b"m-g"
         # Field 9, wire type 2 -> (9 << 3) | 2 = 0x4A
-        cot_event = bytes([
-            0x4A, len(how),
-        ]) + how
+        cot_event = _field(0x4A, how)
 
         assert cot_event[0] == 0x4A
 
@@ -245,40 +277,38 @@ class TestCotEventParsing:
         assert cot_event[0] == 0x30
 
     @pytest.mark.req("REQ-TAK-004")
-    def test_cot_event_point_lat(self):
+    def test_cot_event_point_lat(self, lat_blob):
         """Verify CotEvent lat field (field 10) as double."""
         lat = 38.85606343062312
-        lat_bytes = struct.pack("<d", lat)
         # Field 10, wire type 1 (64-bit) -> (10 << 3) | 1 = 0x51
-        cot_event = bytes([0x51]) + lat_bytes
+        cot_event = bytes([0x51]) + lat_blob
 
         assert cot_event[0] == 0x51
-        parsed_lat = struct.unpack("<d", cot_event[1:9])[0]
-        assert parsed_lat == pytest.approx(lat, rel=1e-15)
+        parsed_lat = _UNPACK_DOUBLE_FROM(cot_event, 1)[0]
+        assert parsed_lat == lat
 
     @pytest.mark.req("REQ-TAK-004")
-    def test_cot_event_point_lon(self):
+    def test_cot_event_point_lon(self, lon_blob):
         """Verify CotEvent lon field (field 11) as double."""
         lon = -77.0563755018233
-        lon_bytes = struct.pack("<d", lon)
         # Field 11, wire type 1 -> (11 << 3) | 1 = 0x59
-        cot_event = bytes([0x59]) + lon_bytes
+        cot_event = bytes([0x59]) + lon_blob
 
         assert cot_event[0] == 0x59
-        parsed_lon = struct.unpack("<d", cot_event[1:9])[0]
-        assert parsed_lon == pytest.approx(lon, rel=1e-15)
+        parsed_lon = _UNPACK_DOUBLE_FROM(cot_event, 1)[0]
+        assert parsed_lon == lon
 
     @pytest.mark.req("REQ-TAK-004")
     def test_cot_event_all_point_fields(self):
         """Verify all point fields (lat, lon, hae, ce, le)."""
         lat, lon, hae, ce, le = 38.85, -77.05, 100.0, 10.0, 5.0
 
-        point_data = (
-            bytes([0x51]) + struct.pack("<d", lat) +   # Field 10 (lat)
-            bytes([0x59]) + struct.pack("<d", lon) +   # Field 11 (lon)
-            bytes([0x61]) + struct.pack("<d", hae) +   # Field 12 (hae)
-            bytes([0x69]) + struct.pack("<d", ce) +    # Field 13 (ce)
-            bytes([0x71]) + struct.pack("<d", le)      # Field 14 (le)
+        point_data = _PACK_POINT_FIELDS(
+            0x51, lat,  # Field 10 (lat)
+            0x59, lon,  # Field 11 (lon)
+            0x61, hae,  # Field 12 (hae)
+            0x69, ce,   # Field 13 (ce)
+            0x71, le,   # Field 14 (le)
         )
 
         # Verify field tags
@@ -305,15 +335,14 @@ class TestDetailParsing:
         callsign = b"HOPE"
         endpoint = b"192.168.1.1:4242:tcp"
 
-        contact = bytes([
-            0x0A, len(endpoint),  # Field 1 (endpoint)
-        ]) + endpoint + bytes([
-            0x12, len(callsign),  # Field 2 (callsign)
-        ]) + callsign
+        contact = b"".join((
+            _field(0x0A, endpoint),  # Field 1 (endpoint)
+            _field(0x12, callsign),  # Field 2 (callsign)
+        ))
 
         # Wrapped in Detail field 2
         # Detail field 2, wire type 2 -> 0x12
-        detail = bytes([0x12, len(contact)]) + contact
+        detail = _field(0x12, contact)
 
         assert detail[0] == 0x12
 
@@ -323,14 +352,13 @@ class TestDetailParsing:
         name = b"Cyan"
         role = b"Team Member"
 
-        group = bytes([
-            0x0A, len(name),  # Field 1 (name)
-        ]) + name + bytes([
-            0x12, len(role),  # Field 2 (role)
-        ]) + role
+        group = b"".join((
+            _field(0x0A, name),  # Field 1 (name)
+            _field(0x12, role),  # Field 2 (role)
+        ))
 
         # Detail field 3, wire type 2 -> 0x1A
-        detail = bytes([0x1A, len(group)]) + group
+        detail = _field(0x1A, group)
 
         assert detail[0] == 0x1A
 
@@ -338,12 +366,10 @@ class TestDetailParsing:
     def test_status_in_detail(self):
         """Verify Status message structure (field 5 in Detail)."""
         # Battery as varint
-        status = bytes([
-            0x08, 0x5A,  # Field 1 (battery): varint 90
-        ])
+        status = b"\x08\x5a"  # Field 1 (battery): varint 90
 
         # Detail field 5, wire type 2 -> 0x2A
-        detail = bytes([0x2A, len(status)]) + status
+        detail = _field(0x2A, status)
 
         assert detail[0] == 0x2A
 
@@ -355,15 +381,15 @@ class TestDetailParsing:
         os_name = b"30"
         version = b"4.5.1.1"
 
-        takv = (
-            bytes([0x0A, len(device)]) + device +
-            bytes([0x12, len(platform)]) + platform +
-            bytes([0x1A, len(os_name)]) + os_name +
-            bytes([0x22, len(version)]) + version
-        )
+        takv = b"".join((
+            _field(0x0A, device),
+            _field(0x12, platform),
+            _field(0x1A, os_name),
+            _field(0x22, version),
+        ))
 
         # Detail field 6, wire type 2 -> 0x32
-        detail = bytes([0x32, len(takv)]) + takv
+        detail = _field(0x32, takv)
 
         assert detail[0] == 0x32
 
@@ -374,13 +400,13 @@ class TestDetailParsing:
         course = 180.0  # degrees
 
         # Track uses doubles (wire type 1)
-        track = (
-            bytes([0x09]) + struct.pack("<d", speed) +  # Field 1 (speed)
-            bytes([0x11]) + struct.pack("<d", course)   # Field 2 (course)
+        track = _PACK_TRACK_FIELDS(
+            0x09, speed,   # Field 1 (speed)
+            0x11, course,  # Field 2 (course)
         )
 
         # Detail field 7, wire type 2 -> 0x3A
-        detail = bytes([0x3A, len(track)]) + track
+        detail = _field(0x3A, track)
 
         assert detail[0] == 0x3A
 
@@ -390,12 +416,12 @@ class TestDetailParsing:
         geopointsrc = b"GPS"
         altsrc = b"GPS"
 
-        precision = (
-            bytes([0x0A, len(geopointsrc)]) + geopointsrc +
-            bytes([0x12, len(altsrc)]) + altsrc
-        )
+        precision = b"".join((
+            _field(0x0A, geopointsrc),
+            _field(0x12, altsrc),
+        ))
 
         # Detail field 4, wire type 2 -> 0x22
-        detail = bytes([0x22, len(precision)]) + precision
+        detail = _field(0x22, precision)
 
         assert detail[0] == 0x22
@@ -0,0 +1,18 @@
+"""
+Varint decoding cases shared by conftest.py and test_protobuf.py.
+
+Kept in a plain module so tests can parametrize over them at collection
+time without importing conftest.
+"""
+
+# Varint decoding cases: (bytes, expected_value, expected_bytes_consumed)
+VARINT_TEST_CASES = (
+    (b"\x00", 0, 1),
+    (b"\x01", 1, 1),
+    (b"\x7f", 127, 1),
+    (b"\x80\x01", 128, 2),
+    (b"\xff\x01", 255, 2),
+    (b"\xac\x02", 300, 2),
+    (b"\x96\x01", 150, 2),
+    (b"\x80\x80\x01", 16384, 3),
+)